@@ -0,0 +1,142 @@
+import threading
+import time
+
+import cv2
+
+from config import CAPTURE_RING_SIZE
+
+
+def open_camera(max_index=6):
+    """
+    Open the first working camera index, or return None.
+    """
+    for i in range(max_index):
+        cam = cv2.VideoCapture(i)
+        if cam.isOpened():
+            return cam
+        cam.release()
+    return None
+
+
+# ============================================================
+#  THREADED CAMERA CAPTURE (LATEST-FRAME RING BUFFER)
+# ============================================================
+
+class CameraCapture:
+    """
+    Reads a cv2.VideoCapture on a background thread so the main loop never
+    blocks on camera I/O and the driver never queues stale frames.
+
+    Frames are decoded into a small ring of reused buffers. Only the newest
+    frame is handed out; the slot currently held by the consumer is never
+    overwritten, so a frame returned by read_latest() stays valid until the
+    next read_latest() call.
+
+    Stats:
+        captured    frames read from the camera
+        delivered   distinct frames handed to the consumer
+        dropped     frames overwritten before anyone read them
+        duplicated  read_latest() calls that returned an already-seen frame
+        failures    failed cap.read() calls
+    """
+
+    def __init__(self, cap, ring_size=CAPTURE_RING_SIZE):
+        # latest + held + one being written
+        ring_size = max(3, ring_size)
+
+        self.cap = cap
+        self._slots = [None] * ring_size
+        self._stamps = [(0.0, 0)] * ring_size
+
+        self._lock = threading.Lock()
+        self._latest = -1       # slot index of newest frame
+        self._held = -1         # slot index the consumer is using
+        self._last_seq = 0      # seq of the last frame handed out
+        self._seq = 0
+
+        self.captured = 0
+        self.delivered = 0
+        self.dropped = 0
+        self.duplicated = 0
+        self.failures = 0
+
+        self._running = False
+        self._thread = None
+
+    # --------------------------------------------------------
+
+    def start(self):
+        if self._running:
+            return self
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="camera-capture", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=1.0):
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _next_slot(self):
+        with self._lock:
+            for i in range(len(self._slots)):
+                if i != self._latest and i != self._held:
+                    return i
+        return 0
+
+    def _run(self):
+        while self._running:
+            slot = self._next_slot()
+
+            ok, frame = self.cap.read(self._slots[slot])
+            if not ok or frame is None:
+                self.failures += 1
+                time.sleep(0.005)
+                continue
+
+            stamp = time.time()
+            with self._lock:
+                self._seq += 1
+                self._slots[slot] = frame
+                self._stamps[slot] = (stamp, self._seq)
+
+                # previous newest frame was never read
+                if self._latest >= 0 and self._stamps[self._latest][1] > self._last_seq:
+                    self.dropped += 1
+
+                self._latest = slot
+                self.captured += 1
+
+    # --------------------------------------------------------
+
+    def read_latest(self):
+        """
+        Non-blocking. Returns (frame, capture_time, seq) for the newest frame,
+        or None if nothing has been captured yet.
+        """
+        with self._lock:
+            if self._latest < 0:
+                return None
+
+            slot = self._latest
+            stamp, seq = self._stamps[slot]
+
+            if seq == self._last_seq:
+                self.duplicated += 1
+            else:
+                self.delivered += 1
+                self._last_seq = seq
+
+            self._held = slot
+            return self._slots[slot], stamp, seq
+
+    def stats(self):
+        return {
+            "captured": self.captured,
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+            "duplicated": self.duplicated,
+            "failures": self.failures,
+        }
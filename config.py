@@ -32,6 +32,95 @@ BASE_SIZE = 100          # base render size for flask / tools
 LERP_FACTOR = 0.18       # smooth movement factor
 
 
+# ------------------------------------------------------------
+# RENDER CONFIG
+# ------------------------------------------------------------
+
+SPRITE_ANGLE_STEP = 2.0              # degrees; tilt is snapped to this step for caching
+SPRITE_CACHE_MAX_BYTES = 64 * 2**20  # LRU memory cap for transformed sprites
+SPRITE_PREWARM = True                # pre-render every tool at scale 1.0 on startup
+
+# "cache":  resize/rotate via PIL once, then reuse from the sprite cache
+# "affine": scale + rotate with one cv2.warpAffine straight into the frame ROI
+RENDER_MODE = "cache"
+
+RENDER_DEBUG_ALLOC = False           # trace bytes allocated per frame by render stages
+
+
+# ------------------------------------------------------------
+# CAMERA CONFIG
+# ------------------------------------------------------------
+
+CAPTURE_THREADED = True    # read the camera on a background thread
+CAPTURE_RING_SIZE = 3      # reused frame buffers in the capture ring
+
+
+# ------------------------------------------------------------
+# PROCESS PIPELINE CONFIG
+# ------------------------------------------------------------
+
+PIPELINE_PROCESSES = False   # capture / detect / render in separate processes
+PIPELINE_RING_SLOTS = 4      # frames in the shared-memory ring
+
+
+# ------------------------------------------------------------
+# HAND TRACKING CONFIG
+# ------------------------------------------------------------
+
+HAND_TRACKING_ASYNC = True     # run MediaPipe on a worker thread
+HAND_MAX_EXTRAPOLATION = 0.1   # seconds a result may be predicted ahead
+
+# detection input: MediaPipe sees a downscaled frame, or a padded crop
+# around the hands found last time
+DETECT_INFERENCE_W = 640        # max width of the image handed to MediaPipe (px)
+DETECT_ROI = True               # crop around tracked hands instead of the whole frame
+DETECT_ROI_PAD = 0.6            # crop padding, fraction of the tracked hands' box size
+DETECT_ROI_MIN = 200            # minimum crop side at full resolution (px)
+DETECT_ROI_MAX_FRACTION = 0.6   # crop larger than this fraction of the frame -> full frame
+DETECT_FULL_EVERY = 15          # full-frame pass every N detections to pick up new hands
+
+# predictive landmark filter (One Euro) + skip-frame detection
+HAND_FILTER_MIN_CUTOFF = 0.3    # Hz; lower = steadier hands when still
+HAND_FILTER_BETA = 10.0         # cutoff rise per unit speed; higher = less lag when moving
+HAND_FILTER_D_CUTOFF = 2.0      # Hz; smoothing of the velocity estimate
+HAND_PREDICT_MIN_SPEED = 0.2    # frame widths / s; slower landmarks are barely extrapolated
+HAND_DETECT_EVERY = 2           # run MediaPipe every N frames, predict in between
+
+
+# ------------------------------------------------------------
+# GESTURE CONFIG
+# ------------------------------------------------------------
+
+# thresholds derived from auto_selection_gesture.classify_pose
+# (pinch < 0.75 palm widths -> grab, tilt > 20 degrees -> pour),
+# split into enter / exit bands so a hand on the edge does not chatter
+GRAB_ENTER_RATIO = 0.65    # thumb-index distance / palm width to start a grab
+GRAB_EXIT_RATIO = 0.85     # ... and to end it
+POUR_ENTER_DEG = 25.0      # hand tilt from vertical to start pouring
+POUR_EXIT_DEG = 15.0       # ... and to stop
+GESTURE_DEBOUNCE = 0.05    # seconds a change must hold before it counts
+
+
+# ------------------------------------------------------------
+# QUALITY GOVERNOR CONFIG
+# ------------------------------------------------------------
+
+FRAME_BUDGET_MS = 33.3     # target frame time (30 FPS camera rate)
+QUALITY_DOWN_RATIO = 1.0   # step down while EMA frame time > budget * this
+QUALITY_UP_RATIO = 0.7     # step up while EMA frame time < budget * this
+QUALITY_DOWN_FRAMES = 15   # consecutive slow frames before stepping down
+QUALITY_UP_FRAMES = 90     # consecutive fast frames before stepping up
+
+# level 0 = best; each entry sets every knob the governor controls
+# (smoke_rate: particles per second per lit burner)
+QUALITY_LEVELS = [
+    {"name": "high",    "resample": "lanczos",  "smoke_rate": 60, "max_particles": 400, "model_complexity": 1, "detect_scale": 1.0},
+    {"name": "medium",  "resample": "bilinear", "smoke_rate": 60, "max_particles": 250, "model_complexity": 1, "detect_scale": 0.75},
+    {"name": "low",     "resample": "bilinear", "smoke_rate": 30, "max_particles": 150, "model_complexity": 0, "detect_scale": 0.5},
+    {"name": "minimum", "resample": "bilinear", "smoke_rate": 30, "max_particles": 80,  "model_complexity": 0, "detect_scale": 0.35},
+]
+
+
 # ------------------------------------------------------------
 # PLATFORM CONFIG
 # ------------------------------------------------------------
@@ -47,6 +136,7 @@ SLOT_H = 130             # slot height
 SLOT_Y = 0.80            # fraction of screen height (0.0–1.0)
 
 SLOT_SPACING = 220       # space between slots
+SLOT_FULL_VOLUME = 600.0 # liquid volume that fills a slot to the top
 
 
 # ------------------------------------------------------------
@@ -56,6 +146,39 @@ SLOT_SPACING = 220       # space between slots
 GRAVITY = 900.0          # gravitational force
 GROUND_DAMPING = 0.3     # bounce reduction
 
+SIM_HZ = 120             # fixed simulation rate (physics, motion, particles)
+SIM_MAX_SUBSTEPS = 8     # most steps per frame; time beyond that is dropped
+
+SPATIAL_CELL_SIZE = 140  # spatial grid cell (px); about the grab radius
+
+COLLIDER_FILL = 0.8      # collider box as a fraction of the sprite size
+COLLISION_ITERATIONS = 6 # contact solver passes per step
+COLLISION_SLOP = 0.5     # penetration (px) left unresolved, keeps stacks calm
+CONTACT_FRICTION = 0.5   # Coulomb friction between objects and on the floor
+SLOT_WALL = 6            # thickness (px) of a slot's side walls
+SLEEP_SPEED = 15.0       # px/s; slower bodies start the sleep timer (> GRAVITY / SIM_HZ)
+SLEEP_TIME = 0.5         # seconds of rest before a body falls asleep
+
+
+# ------------------------------------------------------------
+# WORLD CONFIG
+# ------------------------------------------------------------
+
+WORLD_MAX_OBJECTS = 60         # above this, the longest-unused objects are removed
+DESPAWN_OFFSCREEN_TIME = 5.0   # seconds an object may stay off-screen
+DESPAWN_MARGIN = 100           # px beyond the frame edge that still counts as on-screen
+
+
+# ------------------------------------------------------------
+# PARTICLE CONFIG
+# ------------------------------------------------------------
+
+PARTICLE_CAPACITY = 20000  # particle pool size; the quality cap never exceeds it
+PARTICLE_BUDGET_SOFT = 0.75  # above this fraction of the cap, emitters taper off
+BURNER_SMOKE_CAP = 150     # live smoke particles one burner may own
+DROPPER_DRIP_RATE = 4.0    # droplets per second from a dropper held while pouring
+DROPPER_DROP_CAP = 12      # live droplets one dropper may own
+
 
 # ------------------------------------------------------------
 # REACTION CONFIG
@@ -0,0 +1,239 @@
+import math
+
+import numpy as np
+
+from config import (
+    HAND_FILTER_MIN_CUTOFF,
+    HAND_FILTER_BETA,
+    HAND_FILTER_D_CUTOFF,
+    HAND_PREDICT_MIN_SPEED,
+    HAND_MAX_EXTRAPOLATION,
+    HAND_DETECT_EVERY,
+)
+
+
+# ============================================================
+#  ONE EURO FILTER (VECTORIZED OVER ALL LANDMARKS)
+# ============================================================
+
+def _alpha(cutoff, dt):
+    """
+    Smoothing factor of a first-order low-pass at `cutoff` Hz (scalar or array)
+    for a step of dt seconds.
+    """
+    tau = 1.0 / (2.0 * math.pi * cutoff)
+    return 1.0 / (1.0 + tau / dt)
+
+
+class OneEuroFilter:
+    """
+    One Euro filter (Casiez et al.) over a whole (21, 3) landmark array.
+
+    The cutoff rises with each landmark's speed: heavy smoothing while a
+    hand is still (no jitter), almost none while it moves fast (no lag).
+    The filtered velocity is kept, so the state can also be predicted
+    forward between detections.
+    """
+
+    def __init__(self, min_cutoff=HAND_FILTER_MIN_CUTOFF, beta=HAND_FILTER_BETA,
+                 d_cutoff=HAND_FILTER_D_CUTOFF, predict_speed=HAND_PREDICT_MIN_SPEED):
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.predict_speed = predict_speed
+
+        self.x = None       # filtered landmarks
+        self.dx = None      # filtered velocity (units / second)
+        self.stamp = None
+
+    def update(self, x, stamp):
+        if self.x is None or stamp <= self.stamp:
+            self.x = np.array(x, dtype=np.float32)
+            self.dx = np.zeros_like(self.x)
+            self.stamp = stamp
+            return self.x
+
+        dt = stamp - self.stamp
+        raw_dx = (x - self.x) / dt
+        self.dx += (raw_dx - self.dx) * _alpha(self.d_cutoff, dt)
+
+        # per-landmark image-plane speed drives that landmark's cutoff
+        speed = np.hypot(self.dx[:, 0], self.dx[:, 1])[:, None]
+        cutoff = self.min_cutoff + self.beta * speed
+
+        self.x += (x - self.x) * _alpha(cutoff, dt)
+        self.stamp = stamp
+        return self.x
+
+    def predict(self, now, max_lead=HAND_MAX_EXTRAPOLATION):
+        """
+        Filtered landmarks moved along the filtered velocity to `now`
+        (at most max_lead seconds past the last update).
+
+        The lead is faded out below predict_speed: on a still hand the
+        velocity is mostly detection noise, and extrapolating it would add
+        jitter between detections.
+        """
+        lead = min(max(0.0, now - self.stamp), max_lead)
+        speed2 = self.dx[:, 0] ** 2 + self.dx[:, 1] ** 2
+        trust = speed2 / (speed2 + self.predict_speed ** 2)
+        return self.x + self.dx * (lead * trust)[:, None]
+
+
+# ============================================================
+#  PER-HAND FILTER BANK
+# ============================================================
+
+class HandFilter:
+    """
+    One OneEuroFilter per hand label. update() takes each new detection,
+    predict() returns every tracked hand at any later time, so MediaPipe
+    can run only every few frames without the hands visibly lagging.
+
+    A hand missing from a detection is dropped, as before.
+    """
+
+    def __init__(self, max_lead=HAND_MAX_EXTRAPOLATION, **filter_args):
+        self.max_lead = max_lead
+        self.filter_args = filter_args
+        self.filters = {}
+        self.stamp = None
+
+    def update(self, hands, stamp):
+        """
+        hands: {label: (21, 3) landmarks} from one detection at `stamp`.
+        """
+        for label in list(self.filters):
+            if label not in hands:
+                del self.filters[label]
+
+        for label, lm in hands.items():
+            f = self.filters.get(label)
+            if f is None:
+                f = self.filters[label] = OneEuroFilter(**self.filter_args)
+            f.update(lm, stamp)
+
+        self.stamp = stamp
+
+    def predict(self, now):
+        """
+        {label: (21, 3) landmarks} predicted to `now`.
+        """
+        return {label: f.predict(now, self.max_lead) for label, f in self.filters.items()}
+
+    def age(self, now):
+        """
+        Seconds since the frame behind the latest detection was captured.
+        """
+        if self.stamp is None:
+            return None
+        return now - self.stamp
+
+
+# ============================================================
+#  REPLAY TEST
+# ============================================================
+
+def _replay(seconds=20.0, fps=30.0, noise_px=3.0, width=1280, seed=1):
+    """
+    Synthetic wrist track in pixels: holds still, slow drifts and fast
+    swipes, observed with Gaussian landmark jitter.
+    Returns (stamps, truth, observed) with truth/observed shaped (n, 21, 3),
+    normalized like MediaPipe output.
+    """
+    rng = np.random.default_rng(seed)
+    stamps = np.arange(0.0, seconds, 1.0 / fps)
+
+    x = np.empty_like(stamps)
+    for i, t in enumerate(stamps):
+        phase = t % 5.0
+        if phase < 1.5:                 # still
+            x[i] = 400.0
+        elif phase < 2.5:               # fast swipe right (~700 px/s)
+            x[i] = 400.0 + 700.0 * (phase - 1.5)
+        elif phase < 4.0:               # still
+            x[i] = 1100.0
+        else:                           # fast swipe back
+            x[i] = 1100.0 - 700.0 * (phase - 4.0)
+    y = 360.0 + 40.0 * np.sin(stamps * 1.3)
+
+    truth = np.zeros((len(stamps), 21, 3), dtype=np.float32)
+    truth[:, :, 0] = (x / width)[:, None]
+    truth[:, :, 1] = (y / width)[:, None]
+    observed = truth + rng.normal(0.0, noise_px / width, truth.shape).astype(np.float32)
+    observed[:, :, 2] = 0.0
+    return stamps, truth, observed
+
+
+def _score(name, stamps, truth, estimate, width, settle=10):
+    """
+    jitter:     RMS frame-to-frame motion while the hand is still (px),
+                ignoring the first `settle` frames after each move
+    lag:        mean error along the motion direction during moves (px)
+    overshoot:  worst error in the settle frames right after a move stops (px)
+    error:      RMS error to the true position overall (px)
+    """
+    est = estimate[:, 0, :2] * width
+    tru = truth[:, 0, :2] * width
+
+    vel = np.diff(tru[:, 0], prepend=tru[0, 0])
+    moving = np.abs(vel) > 1e-6
+    recent = np.convolve(moving, np.ones(settle + 1), mode="full")[:len(moving)] > 0
+    settled = ~recent
+    stopping = recent & ~moving
+
+    step = np.diff(est, axis=0, prepend=est[:1])
+    jitter = np.sqrt(np.mean(np.sum(step[settled] ** 2, axis=1)))
+    lag = np.mean((tru[moving, 0] - est[moving, 0]) * np.sign(vel[moving]))
+    overshoot = np.max(np.abs(est[stopping, 0] - tru[stopping, 0]))
+    error = np.sqrt(np.mean(np.sum((est - tru) ** 2, axis=1)))
+
+    print(f"{name:36s} jitter {jitter:5.2f}   lag {lag:5.1f}   "
+          f"overshoot {overshoot:5.1f}   error {error:5.1f}  (px)")
+    return {"jitter": jitter, "lag": lag, "overshoot": overshoot, "error": error}
+
+
+def _check(width=1280, detect_every=HAND_DETECT_EVERY, seeds=(1, 2, 3, 4, 5)):
+    """
+    Replay test: on every seed, the One Euro filter (every frame, and with
+    detection every `detect_every` frames + prediction) must have less lag
+    and overshoot than the 5-frame moving average it replaced, and no more
+    still-hand jitter.
+    """
+    from collections import deque
+
+    for seed in seeds:
+        stamps, truth, observed = _replay(width=width, seed=seed)
+        n = len(stamps)
+
+        # the old main.py behaviour: mean of the last 5 raw wrist positions
+        moving_avg = np.empty_like(observed)
+        buf = deque(maxlen=5)
+        for i in range(n):
+            buf.append(observed[i])
+            moving_avg[i] = np.mean(buf, axis=0)
+
+        def run(every):
+            hf = HandFilter()
+            est = np.empty_like(observed)
+            for i in range(n):
+                if i % every == 0:
+                    hf.update({"Right": observed[i]}, stamps[i])
+                est[i] = hf.predict(stamps[i])["Right"]
+            return est
+
+        print(f"replay seed {seed}: {n} frames, {width} px wide, detection jitter 3 px")
+        _score("raw detections", stamps, truth, observed, width)
+        base = _score("moving average (5)", stamps, truth, moving_avg, width)
+        for every in sorted({1, detect_every}):
+            name = "one euro, every frame" if every == 1 else f"one euro, detect every {every} + predict"
+            got = _score(name, stamps, truth, run(every), width)
+            assert got["jitter"] <= base["jitter"], f"seed {seed}, {name}: jitter {got['jitter']:.2f} px"
+            assert got["lag"] < base["lag"], f"seed {seed}, {name}: lag {got['lag']:.1f} px"
+            assert got["overshoot"] < base["overshoot"], f"seed {seed}, {name}: overshoot {got['overshoot']:.1f} px"
+
+    print("ok: lower lag and overshoot, jitter no worse than the moving average")
+
+
+if __name__ == "__main__":
+    _check()
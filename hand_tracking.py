@@ -0,0 +1,458 @@
+import threading
+import time
+
+import cv2
+import numpy as np
+
+from config import (
+    DETECT_INFERENCE_W, DETECT_ROI, DETECT_ROI_PAD, DETECT_ROI_MIN,
+    DETECT_ROI_MAX_FRACTION, DETECT_FULL_EVERY,
+)
+
+
+# ============================================================
+#  MEDIAPIPE
+# ============================================================
+
+def make_hands(model_complexity=1, static_image_mode=False):
+    """
+    Create the MediaPipe Hands object used everywhere in the lab.
+    (imported lazily so worker processes only load MediaPipe where needed)
+
+    With static_image_mode every image is detected from scratch; without
+    it MediaPipe tracks landmarks from one image to the next, which only
+    works when consecutive images show the same view.
+    """
+    import mediapipe as mp
+
+    return mp.solutions.hands.Hands(
+        static_image_mode=static_image_mode,
+        max_num_hands=2,
+        model_complexity=model_complexity,
+        min_detection_confidence=0.65,
+        min_tracking_confidence=0.5,
+    )
+
+
+# ============================================================
+#  LANDMARK CONVERSION
+# ============================================================
+
+def landmarks_to_array(lm):
+    """
+    MediaPipe NormalizedLandmarkList -> (21, 3) float32 array of (x, y, z).
+    """
+    return np.array([(p.x, p.y, p.z) for p in lm.landmark], dtype=np.float32)
+
+
+def detect_hands(hands_module, rgb):
+    """
+    Run MediaPipe on one RGB frame.
+    Returns {"Left"/"Right": (21, 3) normalized landmarks}.
+    """
+    results = hands_module.process(rgb)
+
+    hands = {}
+    if results.multi_hand_landmarks:
+        for lm, hd in zip(results.multi_hand_landmarks, results.multi_handedness):
+            hands[hd.classification[0].label] = landmarks_to_array(lm)
+    return hands
+
+
+# ============================================================
+#  DETECTION FRONT-END (DOWNSCALE + ROI CROP)
+# ============================================================
+
+class DetectionFrontEnd:
+    """
+    Prepares camera frames for MediaPipe and maps the results back to
+    full-frame coordinates.
+
+    Two modes:
+        "full"  whole frame, downscaled to at most inference_w * scale wide
+        "roi"   padded crop around the hands found last time, downscaled
+                by the same factor (so hands keep the same pixel size
+                and MediaPipe gets a much smaller image)
+
+    Falls back to "full" when tracking is lost (the crop finds no hand),
+    when the crop would cover most of the frame, and every full_every
+    detections so a hand entering elsewhere is still picked up.
+
+    Input is the BGR camera frame; only the small image is converted to RGB.
+    Results use the detect_hands contract, normalized to the full frame.
+
+    The caller's MediaPipe object only ever sees full frames. The crop moves
+    with the hands, so consecutive crops are different views and MediaPipe's
+    frame-to-frame tracking would follow the wrong points; crops go to a
+    second, static_image_mode instance owned here (created on first use,
+    on the calling thread, and released by close()).
+    """
+
+    def __init__(self, inference_w=DETECT_INFERENCE_W, use_roi=DETECT_ROI,
+                 roi_pad=DETECT_ROI_PAD, roi_min=DETECT_ROI_MIN,
+                 roi_max_fraction=DETECT_ROI_MAX_FRACTION, full_every=DETECT_FULL_EVERY,
+                 make_hands=make_hands, model_complexity=1):
+        self.make_hands = make_hands
+        self.model_complexity = model_complexity
+        self._roi_hands = None
+        self.inference_w = inference_w
+        self.use_roi = use_roi
+        self.roi_pad = roi_pad
+        self.roi_min = roi_min
+        self.roi_max_fraction = roi_max_fraction
+        self.full_every = full_every
+        self.scale = 1.0
+
+        self._last = {}             # label -> (21, 3) normalized, last result
+        self._since_full = 0
+        self.mode = "full"
+
+        # mode -> [calls, total seconds in MediaPipe]
+        self._timing = {"full": [0, 0.0], "roi": [0, 0.0]}
+        self.fallbacks = 0
+
+    def set_scale(self, scale):
+        """
+        Quality knob: fraction of inference_w actually used.
+        """
+        self.scale = float(scale)
+
+    def set_model_complexity(self, model_complexity):
+        """
+        Match the crop detector to the caller's model_complexity. Call from
+        the thread that runs detect().
+        """
+        if model_complexity != self.model_complexity:
+            self.model_complexity = model_complexity
+            self.close()
+
+    def close(self):
+        if self._roi_hands is not None:
+            self._roi_hands.close()
+            self._roi_hands = None
+
+    # --------------------------------------------------------
+
+    def _factor(self, W):
+        return min(1.0, self.inference_w * self.scale / W)
+
+    def roi(self, W, H):
+        """
+        Padded pixel rect (x0, y0, x1, y1) around the last detected hands,
+        or None when the full frame should be used.
+        """
+        if not self.use_roi or not self._last or self._since_full >= self.full_every:
+            return None
+
+        pts = np.concatenate([lm[:, :2] for lm in self._last.values()]) * (W, H)
+        (x0, y0), (x1, y1) = pts.min(axis=0), pts.max(axis=0)
+
+        pad_x = (x1 - x0) * self.roi_pad
+        pad_y = (y1 - y0) * self.roi_pad
+        half_w = max((x1 - x0) / 2 + pad_x, self.roi_min / 2)
+        half_h = max((y1 - y0) / 2 + pad_y, self.roi_min / 2)
+        cx, cy = (x0 + x1) / 2, (y0 + y1) / 2
+
+        x0 = int(max(0, cx - half_w))
+        y0 = int(max(0, cy - half_h))
+        x1 = int(min(W, cx + half_w))
+        y1 = int(min(H, cy + half_h))
+
+        if x1 <= x0 or y1 <= y0:
+            return None
+        if (x1 - x0) * (y1 - y0) > self.roi_max_fraction * W * H:
+            return None
+        return x0, y0, x1, y1
+
+    def _run(self, hands_module, frame, rect, mode):
+        H, W = frame.shape[:2]
+        x0, y0, x1, y1 = rect
+        crop = frame[y0:y1, x0:x1]
+
+        f = self._factor(W)
+        if f < 1.0:
+            crop = cv2.resize(crop, None, fx=f, fy=f, interpolation=cv2.INTER_AREA)
+        rgb = cv2.cvtColor(crop, cv2.COLOR_BGR2RGB)
+
+        if mode == "roi":
+            if self._roi_hands is None:
+                self._roi_hands = self.make_hands(self.model_complexity, static_image_mode=True)
+            hands_module = self._roi_hands
+
+        t0 = time.perf_counter()
+        hands = detect_hands(hands_module, rgb)
+        timing = self._timing[mode]
+        timing[0] += 1
+        timing[1] += time.perf_counter() - t0
+
+        if mode == "full":
+            return hands
+
+        # crop-normalized -> full-frame-normalized (z scales with width)
+        cw, ch = x1 - x0, y1 - y0
+        offset = np.array([x0 / W, y0 / H, 0.0], dtype=np.float32)
+        scale = np.array([cw / W, ch / H, cw / W], dtype=np.float32)
+        return {label: lm * scale + offset for label, lm in hands.items()}
+
+    def detect(self, hands_module, frame):
+        """
+        Run MediaPipe on one BGR frame through the current mode.
+        Returns {"Left"/"Right": (21, 3) landmarks normalized to the full frame}.
+        """
+        H, W = frame.shape[:2]
+        rect = self.roi(W, H)
+
+        hands = {}
+        if rect is not None:
+            self.mode = "roi"
+            hands = self._run(hands_module, frame, rect, "roi")
+            self._since_full += 1
+            if not hands:
+                # tracking lost: look at the whole frame this time
+                self.fallbacks += 1
+                rect = None
+
+        if rect is None:
+            self.mode = "full"
+            hands = self._run(hands_module, frame, (0, 0, W, H), "full")
+            self._since_full = 0
+
+        self._last = hands
+        return hands
+
+    def stats(self):
+        """
+        Calls and mean MediaPipe time per mode.
+        """
+        out = {"fallbacks": self.fallbacks}
+        for mode, (calls, total) in self._timing.items():
+            out[f"{mode}_calls"] = calls
+            out[f"{mode}_ms"] = total * 1000.0 / calls if calls else 0.0
+        return out
+
+
+# ============================================================
+#  ASYNC HAND-TRACKING WORKER
+# ============================================================
+
+class HandTracker:
+    """
+    Runs hand detection on a background thread so MediaPipe latency no longer
+    caps the render rate.
+
+    The render loop submit()s each new camera frame (once per camera seq,
+    never a repeated one); the worker only ever processes the newest, through
+    a DetectionFrontEnd (downscale / ROI crop). result() returns the most
+    recent raw landmarks and their capture time; HandFilter smooths them and
+    predicts between detections.
+
+    The MediaPipe object is created and used only on the worker thread.
+    """
+
+    def __init__(self, make_hands=make_hands, model_complexity=1, front_end=None):
+        self.make_hands = make_hands
+        self.model_complexity = model_complexity
+        self.front_end = front_end or DetectionFrontEnd()
+
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+
+        # double-buffered input: submit() fills _pending, worker swaps it out
+        self._pending = None
+        self._working = None
+        self._pending_stamp = None
+        self._complexity_request = None
+
+        self._hands = {}            # label -> landmarks of the newest detection
+        self.result_stamp = None
+
+        self.submitted = 0
+        self.detections = 0
+        self.skipped = 0            # frames replaced before the worker got to them
+        self.last_inference = 0.0   # seconds spent in MediaPipe, last detection
+
+        self._running = False
+        self._thread = None
+
+    # --------------------------------------------------------
+
+    def start(self):
+        if self._running:
+            return self
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="hand-tracking", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=2.0):
+        self._running = False
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def set_model_complexity(self, model_complexity):
+        """
+        Ask the worker to rebuild MediaPipe with a new model_complexity.
+        """
+        if model_complexity != self.model_complexity:
+            with self._lock:
+                self._complexity_request = model_complexity
+
+    def set_detect_scale(self, scale):
+        self.front_end.set_scale(scale)
+
+    def submit(self, frame, stamp=None):
+        """
+        Hand the newest BGR camera frame to the worker (copied; never blocks on detection).
+        """
+        if stamp is None:
+            stamp = time.time()
+
+        with self._lock:
+            if self._pending is None or self._pending.shape != frame.shape:
+                self._pending = np.empty_like(frame)
+            if self._pending_stamp is not None:
+                self.skipped += 1
+            np.copyto(self._pending, frame)
+            self._pending_stamp = stamp
+            self.submitted += 1
+
+        self._wake.set()
+
+    # --------------------------------------------------------
+
+    def _run(self):
+        hands_module = self.make_hands(self.model_complexity)
+        self.front_end.set_model_complexity(self.model_complexity)
+        try:
+            while self._running:
+                self._wake.wait(0.1)
+                self._wake.clear()
+
+                with self._lock:
+                    if self._complexity_request is not None:
+                        self.model_complexity = self._complexity_request
+                        self._complexity_request = None
+                        rebuild = True
+                    else:
+                        rebuild = False
+
+                    if self._pending_stamp is None:
+                        frame = None
+                    else:
+                        self._pending, self._working = self._working, self._pending
+                        frame, stamp = self._working, self._pending_stamp
+                        self._pending_stamp = None
+
+                if rebuild:
+                    hands_module.close()
+                    hands_module = self.make_hands(self.model_complexity)
+                    self.front_end.set_model_complexity(self.model_complexity)
+
+                if frame is None:
+                    continue
+
+                t0 = time.perf_counter()
+                hands = self.front_end.detect(hands_module, frame)
+                self.last_inference = time.perf_counter() - t0
+
+                self._publish(hands, stamp)
+        finally:
+            hands_module.close()
+            self.front_end.close()
+
+    def _publish(self, hands, stamp):
+        with self._lock:
+            self._hands = hands
+            self.result_stamp = stamp
+            self.detections += 1
+
+    # --------------------------------------------------------
+
+    def result(self):
+        """
+        Raw ({label: landmarks}, stamp) of the newest detection (stamp None before the first).
+        """
+        with self._lock:
+            return dict(self._hands), self.result_stamp
+
+    def age(self, now=None):
+        """
+        Seconds since the frame behind the latest result was captured.
+        """
+        if self.result_stamp is None:
+            return None
+        if now is None:
+            now = time.time()
+        return now - self.result_stamp
+
+    def stats(self):
+        return {
+            "submitted": self.submitted,
+            "detections": self.detections,
+            "skipped": self.skipped,
+            "inference_ms": self.last_inference * 1000.0,
+            **self.front_end.stats(),
+        }
+
+
+# ============================================================
+#  CHECK: ROI CROPS AGREE WITH FULL-FRAME DETECTION
+# ============================================================
+
+def _check_roi(frames, tolerance=0.02):
+    """
+    For every BGR frame with hands in it: detect on the full frame, then
+    again through an ROI crop around that result, and require the two to
+    agree within `tolerance` (normalized frame units) on x and y.
+    Returns the number of frames compared.
+    """
+    full_hands = make_hands(static_image_mode=True)
+    full = DetectionFrontEnd(use_roi=False)
+    roi = DetectionFrontEnd(use_roi=True)
+    compared = 0
+    try:
+        for frame in frames:
+            want = full.detect(full_hands, frame)
+            if not want:
+                continue
+
+            roi._last, roi._since_full = want, 0
+            if roi.roi(frame.shape[1], frame.shape[0]) is None:
+                continue            # hands fill the frame, no crop to compare
+            got = roi.detect(full_hands, frame)
+            assert roi.mode == "roi", "crop fell back to the full frame"
+            assert set(got) == set(want), (sorted(got), sorted(want))
+            for label, lm in want.items():
+                err = float(np.abs(got[label][:, :2] - lm[:, :2]).max())
+                assert err < tolerance, (label, err)
+            compared += 1
+    finally:
+        full_hands.close()
+        roi.close()
+    return compared
+
+
+if __name__ == "__main__":
+    import sys
+
+    from camera import open_camera
+
+    # python -m hand_tracking [image ...]; without images, 60 camera frames
+    if len(sys.argv) > 1:
+        frames = [cv2.imread(path) for path in sys.argv[1:]]
+    else:
+        cam = open_camera()
+        if cam is None:
+            sys.exit("no camera and no images given")
+        frames = []
+        for _ in range(60):
+            ok, frame = cam.read()
+            if ok:
+                frames.append(frame)
+        cam.release()
+
+    compared = _check_roi(frames)
+    print(f"ROI crops match full-frame detection on {compared} of {len(frames)} frames")
+    assert compared, "no hands found in any frame"
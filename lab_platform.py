@@ -1,7 +1,112 @@
 import numpy as np
-from config import SLOT_COUNT, SLOT_W, SLOT_H
+from config import SLOT_COUNT, SLOT_W, SLOT_H, SLOT_FULL_VOLUME
 
 
+# ============================================================
+#  SLOT CONTENTS
+# ============================================================
+
+class SlotMixture:
+    """
+    Liquid contents of one slot.
+
+    Keeps running totals instead of a list of pours: the total volume, the
+    volume-weighted colour sums and the amount of each species. Pouring
+    the same species again merges into its entry, and the display colour
+    and fill height are cached until the next change, so drawing a slot
+    costs the same after one pour or after a thousand.
+
+    `version` goes up on every change (StaticLayer repaints on it).
+    """
+
+    def __init__(self, full_volume=SLOT_FULL_VOLUME):
+        self.full_volume = full_volume
+        self.species = {}           # species -> {'color': (r,g,b), 'vol': float}
+        self.volume = 0.0
+        self._weighted = [0.0, 0.0, 0.0]
+        self.version = 0
+        self._cached = None         # (version, color)
+
+    def add(self, color, vol, species=None):
+        """
+        Pour `vol` of a liquid in. Species defaults to the colour, so pours
+        of the same liquid merge.
+        """
+        if vol <= 0:
+            return
+        color = tuple(int(c) for c in color)
+        key = color if species is None else species
+
+        entry = self.species.get(key)
+        if entry is None:
+            self.species[key] = {'color': color, 'vol': float(vol)}
+        else:
+            entry['vol'] += vol
+
+        self.volume += vol
+        w = self._weighted
+        w[0] += color[0] * vol
+        w[1] += color[1] * vol
+        w[2] += color[2] * vol
+        self.version += 1
+
+    def drain(self, vol):
+        """
+        Take `vol` out, evenly from every species (the mixture is stirred).
+        """
+        if self.volume <= 0:
+            return
+        if vol >= self.volume:
+            self.clear()
+            return
+        keep = 1.0 - vol / self.volume
+        for entry in self.species.values():
+            entry['vol'] *= keep
+        self.volume *= keep
+        self._weighted = [c * keep for c in self._weighted]
+        self.version += 1
+
+    def clear(self):
+        self.species.clear()
+        self.volume = 0.0
+        self._weighted = [0.0, 0.0, 0.0]
+        self.version += 1
+
+    def amount(self, species):
+        entry = self.species.get(species)
+        return entry['vol'] if entry is not None else 0.0
+
+    @property
+    def color(self):
+        """
+        Volume-weighted (r, g, b) of the mixture, or None when empty.
+        """
+        if self._cached is None or self._cached[0] != self.version:
+            if self.volume > 0.001:
+                v = self.volume
+                color = tuple(int(c / v) for c in self._weighted)
+            else:
+                color = None
+            self._cached = (self.version, color)
+        return self._cached[1]
+
+    def fill_height(self, height):
+        """
+        Liquid height in pixels for a slot interior `height` tall.
+        """
+        return int(height * min(self.volume / self.full_volume, 1.0))
+
+    def __len__(self):
+        return len(self.species)
+
+    def __iter__(self):
+        return iter(self.species.values())
+
+
+# ============================================================
+#  SLOTS
+# ============================================================
+
 def create_slots():
     """
     Creates the reaction platform slot system.
@@ -9,7 +114,7 @@ def create_slots():
     Each slot stores:
     - position on screen (updated dynamically in main.py)
     - reference to object placed inside (flask/tool)
-    - chemical contents (list of poured liquids)
+    - chemical contents (SlotMixture of poured liquids)
     - tool placed (burner, rack, rod, etc.)
     - glow intensity for highlighting when hand is near
     - smoke particles for reaction effects
@@ -25,7 +130,7 @@ def create_slots():
         slots.append({
             'pos': np.array([0.0, 0.0]),     # (x,y) set every frame in main.py
             'occupied_by': None,             # world object placed in the slot
-            'contents': [],                  # [{'color': (r,g,b), 'vol': float}]
+            'contents': SlotMixture(),       # running totals of poured liquids
             'tool': None,                    # tool ID like "burner", "rack", etc.
             'reaction': None,                # reaction dict or None
             'reaction_start': 0.0,           # timestamp of reaction start
@@ -34,3 +139,54 @@ def create_slots():
         })
 
     return slots
+
+
+# ============================================================
+#  BENCHMARK
+# ============================================================
+
+def _summed_color(contents):
+    """
+    The previous per-frame computation over a list of pours, for comparison.
+    """
+    total_vol = sum(c["vol"] for c in contents)
+    if total_vol <= 0.001:
+        return None
+    r = sum(c["color"][0] * c["vol"] for c in contents) / total_vol
+    g = sum(c["color"][1] * c["vol"] for c in contents) / total_vol
+    b = sum(c["color"][2] * c["vol"] for c in contents) / total_vol
+    return int(r), int(g), int(b)
+
+
+if __name__ == "__main__":
+    import time
+
+    rng = np.random.default_rng(0)
+    liquids = [(0, 120, 255), (255, 60, 40), (40, 200, 90)]
+
+    print("display colour + fill height per slot per frame")
+    for pours in (1, 10, 100, 1000):
+        pour_list = []
+        mix = SlotMixture()
+        for _ in range(pours):
+            color = liquids[rng.integers(len(liquids))]
+            vol = float(rng.uniform(1.0, 20.0))
+            pour_list.append({'color': color, 'vol': vol})
+            mix.add(color, vol)
+        assert all(abs(a - b) <= 1 for a, b in zip(_summed_color(pour_list), mix.color))
+
+        n = 2000
+        t0 = time.perf_counter()
+        for _ in range(n):
+            _summed_color(pour_list)
+            int((SLOT_H - 10) * min(sum(c["vol"] for c in pour_list) / SLOT_FULL_VOLUME, 1.0))
+        old = (time.perf_counter() - t0) / n
+
+        t0 = time.perf_counter()
+        for _ in range(n):
+            mix.color
+            mix.fill_height(SLOT_H - 10)
+        new = (time.perf_counter() - t0) / n
+
+        print(f"  {pours:5d} pours: summed list {old * 1e6:8.2f} us   "
+              f"SlotMixture {new * 1e6:5.2f} us   ({len(mix)} species)")
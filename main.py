@@ -9,6 +9,7 @@ import os
 import time
 import math
 from collections import deque
+from contextlib import ExitStack
 import numpy as np
 import cv2
 from PIL import Image, ImageDraw
@@ -21,19 +22,36 @@ from config import (
     GRAVITY,
     REACTION_DURATION, SMOKE_PARTICLES,
     FLAME_SPEED, FLAME_SCALE, FLAME_OFFSET_Y,
+    SPRITE_PREWARM, RENDER_DEBUG_ALLOC, BURNER_SMOKE_CAP, DROPPER_DRIP_RATE, DROPPER_DROP_CAP,
+    CAPTURE_THREADED, HAND_TRACKING_ASYNC, PIPELINE_PROCESSES, HAND_DETECT_EVERY,
 )
 
 from utils import clamp, lerp, distance
+from camera import CameraCapture, open_camera
+from hand_tracking import DetectionFrontEnd, HandTracker, make_hands
+from hand_filter import HandFilter
+from hand_features import extract as extract_hand_features
+from pipeline import ProcessPipeline
 from tools import TOOLS, load_tool_image
 from objects import make_object
+from world_store import WorldStore
 from lab_platform import create_slots
 from reactions import trigger_reaction
-from ui_toolbar import draw_ribbon, handle_ribbon_interaction
+from ui_toolbar import draw_ribbon, handle_ribbon_interaction, ribbon_hover
 from systems.physics_system import update as physics_update
+from systems.collision_system import update as collision_update
+from systems.despawn_system import update as despawn_update
 from systems.motion_system import update as motion_update
-from systems.particle_systems import update as particle_update ,spawn_smoke
-from systems.grab_system import update as grab_update
-from render.renderer import render_world, render_slots,render_platform_base,render_toolbar,render_burner_flames,render_particles
+from systems.particle_systems import update as particle_update, ParticlePool, EmitterSystem
+from systems.grab_system import GrabSystem
+from systems.gesture_system import GestureClassifier
+from systems.spatial_index import SpatialGrid
+from systems.scheduler import FixedStepScheduler
+from render.renderer import render_world, render_slots,render_platform_base,render_toolbar,render_burner_flames,render_particles, world_stats
+from render.sprite_cache import SPRITE_CACHE
+from render.static_layer import StaticLayer
+from render.frame_renderer import FrameRenderer
+from systems.quality_governor import QualityGovernor
 
 
 
@@ -44,202 +62,375 @@ hand_holding = {"Left": None, "Right": None}
 ROTATABLE_TOOLS = {"flask", "test_tube"}
 
 
-# -------------------------------------------------
-# MediaPipe
-# -------------------------------------------------
-mp_hands = mp.solutions.hands
-hands_module = mp_hands.Hands(
-    max_num_hands=2,
-    min_detection_confidence=0.65,
-    min_tracking_confidence=0.5,
-)
-
-
-# -------------------------------------------------
-# Window + Camera
-# -------------------------------------------------
-WINDOW_NAME = "Virtual Chemistry Lab-1"
-cv2.namedWindow(WINDOW_NAME, cv2.WND_PROP_FULLSCREEN)
-cv2.setWindowProperty(WINDOW_NAME, cv2.WND_PROP_FULLSCREEN, cv2.WINDOW_FULLSCREEN)
-
-cap = None
-for i in range(6):
-    cam = cv2.VideoCapture(i)
-    if cam.isOpened():
-        cap = cam
-        break
-if cap is None:
-    raise RuntimeError("No camera found")
-
-
-# -------------------------------------------------
-# Assets
-# -------------------------------------------------
-def load_frames(folder, prefix, max_count=200):
-    frames = []
-    for i in range(1, max_count):
-        path = os.path.join(folder, f"{prefix}_{i:02d}.png")
-        if not os.path.exists(path):
-            break
-        frames.append(Image.open(path).convert("RGBA"))
-    return frames
-
-
-FLAME_FRAMES = load_frames("tool_images/flame_frames", "flame", 300)
-DROPLET_FRAMES = load_frames("tool_images/droplet_frames", "drop", 200)
-
-
-# -------------------------------------------------
-# World state
-# -------------------------------------------------
-world_objects = [
-    make_object("flask", 300, 220),
-    make_object("flask", 600, 220),
-]
-
-slot_states = create_slots()
-droplets = []
-
-particles=[]
-
-hand_buffers = {"Left": deque(maxlen=5), "Right": deque(maxlen=5)}
-pinch_prev = {"Left": False, "Right": False}
-
-prev_time = time.time()  
-
-
-
-
-
-# -------------------------------------------------
-# Helpers
-# -------------------------------------------------
-def ensure_burner_fields(obj):
-    if obj.get("type") != "burner":
-        return
-    if "flame_frames" not in obj:
-        obj["flame_frames"] = FLAME_FRAMES
-        obj["flame_index"] = 0
-        obj["flame_timer"] = 0.0
-        obj["flame_on"] = False
-
-
-def compute_slot_positions(W, H):
-    center_x = W // 2
-    base_y = int(H * SLOT_Y) if SLOT_Y < 1.0 else min(H - 150, int(SLOT_Y))
-    left = center_x - ((SLOT_COUNT - 1) * SLOT_SPACING) // 2
-    for i, s in enumerate(slot_states):
-        s["pos"] = np.array([left + i * SLOT_SPACING, base_y], float)
-
-
-# -------------------------------------------------
-# Main loop
-# -------------------------------------------------
-try:
-    while True:
-        now = time.time()
-        dt = now - prev_time
-        prev_time = now
-        if dt <= 0 or dt > 0.3:
-            dt = 1 / 60
-
-        ok, frame = cap.read()
-        if not ok:
-            continue
-
-        frame = cv2.flip(frame, 1)
-        H, W = frame.shape[:2]
-        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-
-        
-        
-        # - - - - - - - - - - - - - - - - - - - - - - - -
-        
-        for obj in world_objects:
-            if obj.get("type") == "burner" and obj.get("flame_on"):
-                spawn_smoke(
-            particles,
-            obj["pos"][0],
-            obj["pos"][1] - BASE_SIZE // 2 - 30,
-            count=2,
-        )
-
-
-        # -------------------------
-        # Hand detection
-        # -------------------------
-        detected_hands = {}
-        results = hands_module.process(rgb)
-
-        if results.multi_hand_landmarks:
-            for lm, hd in zip(results.multi_hand_landmarks, results.multi_handedness):
-                label = hd.classification[0].label
-                wrist = lm.landmark[mp_hands.HandLandmark.WRIST]
-                index = lm.landmark[mp_hands.HandLandmark.INDEX_FINGER_TIP]
-                thumb = lm.landmark[mp_hands.HandLandmark.THUMB_TIP]
-                mcp = lm.landmark[mp_hands.HandLandmark.INDEX_FINGER_MCP]
-
-                wrist_px = np.array([wrist.x * W, wrist.y * H])
-                index_px = np.array([index.x * W, index.y * H])
-                thumb_px = np.array([thumb.x * W, thumb.y * H])
-                mcp_px = np.array([mcp.x * W, mcp.y * H])
-
-                buf = hand_buffers[label]
-                buf.append(wrist_px)
-                smooth_wrist = np.mean(buf, axis=0)
-
-                detected_hands[label] = {
-                    "wrist": smooth_wrist,
-                    "index": index_px,
-                    "pinch": distance(index_px, thumb_px) < 40,
-                    "angle": math.atan2(mcp_px[1]-wrist_px[1], mcp_px[0]-wrist_px[0]),
-                }
-                
-                grab_update(detected_hands, world_objects)
-
-
-        # -------------------------
-        # Toolbar
-        # -------------------------
-        toolbar, icon_positions = draw_ribbon(W)
-        handle_ribbon_interaction(detected_hands, W, H, icon_positions, world_objects)
-
-        for obj in world_objects:
-            if obj.get("type")=="burner":
-                obj["flame_on"] = True
-        # -------------------------
-        # Physics (gravity only)
-        # -------------------------
-        floor_y = H - 80
-        grab_update(detected_hands,world_objects)
-        physics_update(world_objects, dt, floor_y)
-        motion_update(world_objects,dt,ensure_burner_fields)
-        particle_update(particles, dt)
-
-        # -------------------------
-        # Rotation & damping
-        # -------------------------
-        
-
-        # -------------------------
-        # Render (temporary inline)
-        # -------------------------
-        out = render_world(frame,world_objects,BASE_SIZE)
-        out = render_platform_base(out,H)
-        out = render_slots(out,slot_states,SLOT_W,SLOT_H)
-        out = render_toolbar(out,toolbar)
-        out = render_burner_flames(out,world_objects, dt,BASE_SIZE)
-        out = render_particles(out,particles)
-        cv2.imshow(WINDOW_NAME,out)
-        
-
-        # -------------------------
-        # Exit
-        # -------------------------
-        if cv2.waitKey(1) & 0xFF == 27:
-            break
-
-finally:
-    cap.release()
-    cv2.destroyAllWindows()
-    hands_module.close()
+# spawned pipeline processes re-import this script as "__mp_main__";
+# everything below only runs in the real main process
+if __name__ == "__main__":
+
+    # -------------------------------------------------
+    # Startup / shutdown
+    # -------------------------------------------------
+    # every resource registers its cleanup here as it is created;
+    # leaving the `with resources:` block around the main loop releases them
+    # in reverse order
+    resources = ExitStack()
+    resources.callback(cv2.destroyAllWindows)
+
+
+    # -------------------------------------------------
+    # MediaPipe
+    # -------------------------------------------------
+    mp_hands = mp.solutions.hands
+
+    hands_module = None
+    front_end = None
+    tracker = None
+    pipeline = None
+
+    if PIPELINE_PROCESSES:
+        # capture + detection in their own processes (see pipeline.py)
+        pipeline = resources.enter_context(ProcessPipeline())
+    elif HAND_TRACKING_ASYNC:
+        tracker = HandTracker(make_hands).start()
+        resources.callback(lambda: print(f"[HANDS] {tracker.stats()}"))
+        resources.callback(tracker.stop)
+    else:
+        hands_module = make_hands()
+        front_end = DetectionFrontEnd()
+        # looked up at exit: apply_quality may have replaced it
+        resources.callback(lambda: hands_module.close())
+        resources.callback(front_end.close)
+        resources.callback(lambda: print(f"[HANDS] {front_end.stats()}"))
+
+
+    # -------------------------------------------------
+    # Window + Camera
+    # -------------------------------------------------
+    WINDOW_NAME = "Virtual Chemistry Lab-1"
+    cv2.namedWindow(WINDOW_NAME, cv2.WND_PROP_FULLSCREEN)
+    cv2.setWindowProperty(WINDOW_NAME, cv2.WND_PROP_FULLSCREEN, cv2.WINDOW_FULLSCREEN)
+
+    cap = None
+    camera = None
+
+    if pipeline is None:
+        cap = open_camera()
+        if cap is None:
+            resources.close()
+            raise RuntimeError("No camera found")
+        resources.callback(cap.release)
+
+        if CAPTURE_THREADED:
+            camera = CameraCapture(cap).start()
+            resources.callback(lambda: print(f"[CAMERA] {camera.stats()}"))
+            resources.callback(camera.stop)
+
+
+    # -------------------------------------------------
+    # Assets
+    # -------------------------------------------------
+    def load_frames(folder, prefix, max_count=200):
+        frames = []
+        for i in range(1, max_count):
+            path = os.path.join(folder, f"{prefix}_{i:02d}.png")
+            if not os.path.exists(path):
+                break
+            frames.append(Image.open(path).convert("RGBA"))
+        return frames
+
+
+    FLAME_FRAMES = load_frames("tool_images/flame_frames", "flame", 300)
+    DROPLET_FRAMES = load_frames("tool_images/droplet_frames", "drop", 200)
+
+    if SPRITE_PREWARM:
+        SPRITE_CACHE.prewarm(sizes=(BASE_SIZE,))
+
+
+    # -------------------------------------------------
+    # World state
+    # -------------------------------------------------
+    # struct-of-arrays store; behaves like the old list of object dicts
+    world_objects = WorldStore()
+    world_objects.extend([
+        make_object("flask", 300, 220),
+        make_object("flask", 600, 220),
+    ])
+
+    slot_states = create_slots()
+    spatial_index = SpatialGrid()      # refiled after physics every frame
+    static_layer = StaticLayer(SLOT_W, SLOT_H)
+    droplets = []
+
+    particles = ParticlePool()
+    emitters = EmitterSystem(particles)
+
+    # One Euro filter per hand; also predicts between skipped detections
+    hand_filter = HandFilter()
+    gestures = GestureClassifier()
+    grabs = GrabSystem()
+    frame_seq = 0           # seq of the camera frame being processed
+    detected_seq = 0        # camera frames seen by the detection gate
+    camera_frames = 0
+    slot_layout = None      # (W, H) the slot positions were laid out for
+    scheduler = FixedStepScheduler()
+    pinch_prev = {"Left": False, "Right": False}
+
+    prev_time = time.time()  
+
+
+    # -------------------------------------------------
+    # Render pipeline (stages draw in place into renderer-owned buffers)
+    # -------------------------------------------------
+    renderer = FrameRenderer(debug=RENDER_DEBUG_ALLOC)
+    renderer.add_stage("world", lambda out, scratch: render_world(out, world_objects, BASE_SIZE, out=out))
+    renderer.add_stage("static", lambda out, scratch: static_layer.render(out, slot_states, toolbar))
+    renderer.add_stage("flames", lambda out, scratch: render_burner_flames(out, world_objects, dt, BASE_SIZE))
+    renderer.add_stage("particles", lambda out, scratch: render_particles(out, particles))
+
+
+    def draw_hud(out, scratch):
+        text = governor.hud_text()
+        hand_age = hand_filter.age(time.time())
+        if hand_age is not None:
+            text += f"  hands {hand_age * 1000:.0f}ms old"
+        counts = world_objects.counts()
+        text += (f"  objs {counts['awake']} awake / {counts['asleep']} asleep"
+                 f" / {world_stats['culled']} culled")
+        cv2.putText(out, text, (10, out.shape[0] - 12),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.5, (230, 230, 230), 1)
+
+
+    renderer.add_stage("hud", draw_hud)
+
+
+    # -------------------------------------------------
+    # Quality governor
+    # -------------------------------------------------
+    governor = QualityGovernor()
+    quality = governor.settings
+    hands_complexity = 1
+
+
+    def apply_quality(q):
+        """
+        Push the governor's current knobs into the systems that use them.
+        """
+        global hands_module, hands_complexity
+        SPRITE_CACHE.set_resample(q["resample"])
+        if pipeline is not None:
+            pipeline.set_model_complexity(q["model_complexity"])
+            pipeline.set_detect_scale(q["detect_scale"])
+        elif tracker is not None:
+            tracker.set_model_complexity(q["model_complexity"])
+            tracker.set_detect_scale(q["detect_scale"])
+        else:
+            front_end.set_scale(q["detect_scale"])
+            if q["model_complexity"] != hands_complexity:
+                hands_module.close()
+                hands_module = make_hands(q["model_complexity"])
+                hands_complexity = q["model_complexity"]
+                front_end.set_model_complexity(hands_complexity)
+
+
+
+
+
+    # -------------------------------------------------
+    # Helpers
+    # -------------------------------------------------
+    def ensure_burner_fields(obj):
+        if obj.get("type") != "burner":
+            return
+        if "flame_frames" not in obj:
+            obj["flame_frames"] = FLAME_FRAMES
+            obj["flame_index"] = 0
+            obj["flame_timer"] = 0.0
+            obj["flame_on"] = False
+
+
+    def compute_slot_positions(W, H):
+        center_x = W // 2
+        base_y = int(H * SLOT_Y) if SLOT_Y < 1.0 else min(H - 150, int(SLOT_Y))
+        left = center_x - ((SLOT_COUNT - 1) * SLOT_SPACING) // 2
+        for i, s in enumerate(slot_states):
+            s["pos"] = np.array([left + i * SLOT_SPACING, base_y], float)
+
+
+    # -------------------------------------------------
+    # Main loop
+    # -------------------------------------------------
+    with resources:
+        while True:
+            now = time.time()
+            frame_dt = now - prev_time
+            prev_time = now
+            dt = frame_dt
+            if dt <= 0 or dt > 0.3:
+                dt = 1 / 60
+
+            if pipeline is not None:
+                latest = pipeline.read_latest()
+                if latest is None:
+                    time.sleep(0.001)
+                    continue
+                frame, capture_time, frame_seq = latest
+            elif camera is not None:
+                latest = camera.read_latest()
+                if latest is None:
+                    time.sleep(0.001)
+                    continue
+                frame, capture_time, frame_seq = latest
+            else:
+                ok, frame = cap.read()
+                if not ok:
+                    continue
+                capture_time = time.time()
+                frame_seq += 1
+
+            work_start = time.perf_counter()
+            # the capture process already mirrors its frames
+            frame = renderer.prepare(frame, flip=pipeline is None)
+            H, W = frame.shape[:2]
+
+            # slots (and with them their collision walls) follow the frame size
+            if slot_layout != (W, H):
+                compute_slot_positions(W, H)
+                slot_layout = (W, H)
+
+
+            # - - - - - - - - - - - - - - - - - - - - - - - -
+
+            # burners own time-based smoke emitters (rate in particles / second)
+            for obj in world_objects:
+                if obj.get("type") != "burner":
+                    continue
+                key = ("burner", id(obj))
+                if not obj.get("flame_on"):
+                    emitters.remove(key)
+                    continue
+                emitter = emitters.get(key)
+                if emitter is None:
+                    emitter = emitters.add(key, "smoke", None, cap=BURNER_SMOKE_CAP)
+                emitter.pos = (obj["pos"][0], obj["pos"][1] - BASE_SIZE // 2 - 30)
+                emitter.rate = quality["smoke_rate"]
+
+
+            # -------------------------
+            # Hand detection
+            # -------------------------
+            # MediaPipe runs on every HAND_DETECT_EVERY-th new camera frame; render
+            # ticks that reuse the same camera frame never re-detect it, and the
+            # filter predicts in between
+            detect_now = False
+            if frame_seq != detected_seq:
+                detected_seq = frame_seq
+                camera_frames += 1
+                detect_now = camera_frames % HAND_DETECT_EVERY == 0
+
+            if pipeline is not None:
+                raw_hands, raw_stamp = pipeline.result()
+            elif tracker is not None:
+                # downscale / ROI crop happen on the worker (DetectionFrontEnd)
+                if detect_now:
+                    tracker.submit(frame, capture_time)
+                raw_hands, raw_stamp = tracker.result()
+            elif detect_now:
+                raw_hands, raw_stamp = front_end.detect(hands_module, frame), capture_time
+            else:
+                raw_stamp = None
+
+            if raw_stamp is not None and raw_stamp != hand_filter.stamp:
+                hand_filter.update(raw_hands, raw_stamp)
+            hand_landmarks = hand_filter.predict(now)
+            hand_age = hand_filter.age(now)
+
+            # all features for both hands in one batch (hand_features.py)
+            detected_hands = extract_hand_features(hand_landmarks, W, H, hand_age)
+
+            # pinch = debounced grab state, not the raw per-frame distance test
+            gesture_events = gestures.update(detected_hands, now)
+            for label, event in gesture_events:
+                print(f"[GESTURE] {label} {event}")
+            for label, hand in detected_hands.items():
+                detected_hands[label] = hand._replace(pinch=gestures.active(label, "grab"))
+
+
+            # -------------------------
+            # Toolbar
+            # -------------------------
+            toolbar, icon_positions = draw_ribbon(W)
+            hover = ribbon_hover(detected_hands, icon_positions)
+            if hover is not None:
+                toolbar, icon_positions = draw_ribbon(W, hover)
+            spawned = handle_ribbon_interaction(detected_hands, W, H, icon_positions, world_objects)
+            if spawned is not None:
+                # grabbable this frame, before the next rebuild
+                spatial_index.insert(spawned)
+
+            for obj in world_objects:
+                if obj.get("type")=="burner":
+                    obj["flame_on"] = True
+            # -------------------------
+            # Physics (gravity, collisions)
+            # -------------------------
+            floor_y = H - 80
+            grabs.update(detected_hands, world_objects, gesture_events, spatial_index)
+
+            # a dropper drips while the hand holding it pours (rate in droplets / second)
+            for obj in world_objects:
+                if obj.get("type") != "dropper":
+                    continue
+                key = ("dropper", id(obj))
+                label = obj.get("grabbed_by") if obj.get("grabbed") else None
+                if label is None or not gestures.active(label, "pour"):
+                    emitters.remove(key)
+                    continue
+                emitter = emitters.get(key)
+                if emitter is None:
+                    emitter = emitters.add(key, "droplet", None, rate=DROPPER_DRIP_RATE, cap=DROPPER_DROP_CAP,
+                                           color=obj.get("liquid_color") or (255, 120, 0))
+                emitter.pos = (obj["pos"][0], obj["pos"][1] + BASE_SIZE * obj["scale"] / 2)
+            particles.cap = quality["max_particles"]
+
+            # fixed-rate simulation; the frame's time is split into steps
+            step = scheduler.dt
+            for _ in range(scheduler.advance(frame_dt)):
+                world_objects.save_previous()
+                physics_update(world_objects, step, floor_y)
+                collision_update(world_objects, step, floor_y, slot_states)
+                motion_update(world_objects, step, ensure_burner_fields)
+                emitters.update(step)
+                particle_update(particles, step, quality["max_particles"])
+
+            # drop long-off-screen and least recently used objects; slotted ones stay
+            for obj in despawn_update(world_objects, dt, W, H, slot_states, floor_y):
+                emitters.remove(("burner", id(obj)))
+                emitters.remove(("dropper", id(obj)))
+                print(f"[WORLD] despawned {obj.get('tool_id')}, {len(world_objects)} objects left")
+            spatial_index.rebuild(world_objects)
+
+            # -------------------------
+            # Rotation & damping
+            # -------------------------
+
+
+            # -------------------------
+            # Render (temporary inline)
+            # -------------------------
+            # objects drawn between the last two steps by the leftover time
+            with world_objects.interpolated(scheduler.alpha):
+                out = renderer.render()
+            cv2.imshow(WINDOW_NAME,out)
+
+            if RENDER_DEBUG_ALLOC and renderer.frames % 120 == 0:
+                print(f"[RENDER] alloc {renderer.stats()}")
+
+            if governor.update(time.perf_counter() - work_start):
+                quality = governor.settings
+                apply_quality(quality)
+
+
+            # -------------------------
+            # Exit
+            # -------------------------
+            if cv2.waitKey(1) & 0xFF == 27:
+                break
@@ -33,3 +33,27 @@ def apply_gravity(obj, dt, floor_y):
             else:
                 # Stop moving after small bounces
                 obj['vel'][1] = 0.0
+
+
+def apply_gravity_all(store, dt, floor_y):
+    """
+    apply_gravity for every active, free object of a WorldStore at once.
+    Sleeping objects are skipped.
+    """
+    n = store.size
+    free = store.used[:n] & store.active[:n] & ~store.grabbed[:n] & ~store.asleep[:n]
+    if not free.any():
+        return
+
+    pos = store.pos[:n]
+    vel = store.vel[:n]
+
+    vel[free, 1] += GRAVITY * dt
+    pos[free] += vel[free] * dt
+
+    # Floor collision: bounce with damping, or stop after small bounces
+    hit = free & (pos[:, 1] > floor_y)
+    if hit.any():
+        pos[hit, 1] = floor_y
+        vy = vel[hit, 1]
+        vel[hit, 1] = np.where(np.abs(vy) > 50, -vy * GROUND_DAMPING, 0.0)
@@ -0,0 +1,411 @@
+import multiprocessing
+import queue
+import time
+from multiprocessing import shared_memory
+
+import cv2
+import numpy as np
+
+from config import PIPELINE_RING_SLOTS, HAND_DETECT_EVERY
+from hand_tracking import DetectionFrontEnd, make_hands
+
+
+# ============================================================
+#  SHARED-MEMORY FRAME RING
+# ============================================================
+
+class SharedFrameRing:
+    """
+    Fixed ring of uint8 frames in one shared-memory block, plus a small header:
+
+        header[0]        slot index of the newest frame
+        header[1]        sequence number of the newest frame (0 = none yet)
+        header[2 + i]    sequence number held by slot i (-1 while being written)
+        stamps[i]        capture time of slot i
+
+    One writer, any number of readers. Readers get zero-copy numpy views;
+    read_latest() additionally validates the copy against the slot's sequence
+    number so a frame overwritten mid-copy is retried.
+    """
+
+    def __init__(self, shape, slots=PIPELINE_RING_SLOTS, name=None):
+        self.shape = tuple(shape)
+        self.slots = slots
+
+        frame_bytes = int(np.prod(self.shape))
+        header_bytes = 8 * (2 + slots)
+        stamp_bytes = 8 * slots
+        size = header_bytes + stamp_bytes + frame_bytes * slots
+
+        self.owner = name is None
+        if self.owner:
+            self.shm = shared_memory.SharedMemory(create=True, size=size)
+        else:
+            self.shm = _attach(name)
+
+        buf = self.shm.buf
+        self.header = np.ndarray((2 + slots,), dtype=np.int64, buffer=buf)
+        self.stamps = np.ndarray((slots,), dtype=np.float64, buffer=buf, offset=header_bytes)
+        self.frames = np.ndarray(
+            (slots,) + self.shape, dtype=np.uint8, buffer=buf,
+            offset=header_bytes + stamp_bytes,
+        )
+
+        if self.owner:
+            self.header[:] = 0
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    # writer -------------------------------------------------
+
+    def begin_write(self):
+        """
+        Next slot to fill (never the newest one). Returns (index, view).
+        """
+        i = (int(self.header[0]) + 1) % self.slots
+        self.header[2 + i] = -1
+        return i, self.frames[i]
+
+    def publish(self, i, stamp):
+        seq = int(self.header[1]) + 1
+        self.stamps[i] = stamp
+        self.header[2 + i] = seq
+        self.header[0] = i
+        self.header[1] = seq
+        return seq
+
+    # readers ------------------------------------------------
+
+    def latest_seq(self):
+        return int(self.header[1])
+
+    def view_latest(self):
+        """
+        Zero-copy (view, stamp, seq) of the newest frame, or None.
+        The view is the slot itself, not a copy: the writer overwrites it
+        after slots - 1 more frames, so use it before then or copy it.
+        """
+        seq = int(self.header[1])
+        if seq == 0:
+            return None
+        i = int(self.header[0])
+        return self.frames[i], float(self.stamps[i]), seq
+
+    def read_latest(self, dst, retries=3):
+        """
+        Copy the newest frame into dst. Returns (stamp, seq) or None.
+        """
+        for _ in range(retries):
+            seq = int(self.header[1])
+            if seq == 0:
+                return None
+            i = int(self.header[0])
+            slot_seq = int(self.header[2 + i])
+            if slot_seq < 0:
+                continue
+
+            stamp = float(self.stamps[i])
+            np.copyto(dst, self.frames[i])
+            if int(self.header[2 + i]) == slot_seq:
+                return stamp, slot_seq
+        return None
+
+    def close(self):
+        # drop numpy views before closing the mapping
+        self.header = self.stamps = self.frames = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+def _attach(name):
+    """
+    Attach to an existing block. Only the owner unlinks it.
+
+    Stage processes are spawned from the owner and share its resource
+    tracker, where registering the same name again is a no-op, so on
+    Python < 3.13 a plain attach is safe (unregistering here would drop
+    the owner's registration instead).
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:  # Python < 3.13
+        return shared_memory.SharedMemory(name=name)
+
+
+# ============================================================
+#  STAGE PROCESSES
+# ============================================================
+
+def _capture_stage(control, ring_names, stop, counter, slots):
+    """
+    Camera process: read, mirror straight into the shared ring, publish.
+    """
+    from camera import open_camera
+
+    cap = open_camera()
+    if cap is None:
+        control.put(("error", "No camera found"))
+        return
+
+    ok, frame = cap.read()
+    if not ok:
+        cap.release()
+        control.put(("error", "Camera returned no frame"))
+        return
+
+    control.put(("shape", frame.shape))
+    ring = SharedFrameRing(frame.shape, slots, name=ring_names.get())
+
+    try:
+        while not stop.is_set():
+            ok, frame = cap.read(frame)
+            if not ok:
+                time.sleep(0.005)
+                continue
+
+            i, view = ring.begin_write()
+            cv2.flip(frame, 1, dst=view)
+            ring.publish(i, time.time())
+            counter.value += 1
+    finally:
+        cap.release()
+        ring.close()
+
+
+def _detect_stage(ring_name, shape, slots, results, stop, counter, detect_scale, complexity, every):
+    """
+    Hand-detection process: newest frame -> MediaPipe -> small landmark queue.
+    Runs at most once every `every` camera frames.
+    """
+    ring = SharedFrameRing(shape, slots, name=ring_name)
+    frame = np.empty(shape, dtype=np.uint8)
+    current_complexity = complexity.value
+    front_end = DetectionFrontEnd(model_complexity=current_complexity)
+    hands_module = make_hands(current_complexity)
+    last_seq = 0
+
+    try:
+        while not stop.is_set():
+            if ring.latest_seq() < last_seq + every:
+                time.sleep(0.002)
+                continue
+
+            got = ring.read_latest(frame)
+            if got is None:
+                continue
+            stamp, last_seq = got
+
+            if complexity.value != current_complexity:
+                current_complexity = complexity.value
+                hands_module.close()
+                hands_module = make_hands(current_complexity)
+                front_end.set_model_complexity(current_complexity)
+
+            front_end.set_scale(detect_scale.value)
+            t0 = time.perf_counter()
+            hands = front_end.detect(hands_module, frame)
+            inference = time.perf_counter() - t0
+            counter.value += 1
+
+            # keep only the freshest results: drop the oldest if the queue is full
+            item = (stamp, last_seq, inference, front_end.mode, hands)
+            try:
+                results.put_nowait(item)
+            except queue.Full:
+                try:
+                    results.get_nowait()
+                except queue.Empty:
+                    pass
+                try:
+                    results.put_nowait(item)
+                except queue.Full:
+                    pass
+    finally:
+        print(f"[PIPELINE] detect {front_end.stats()}")
+        hands_module.close()
+        front_end.close()
+        ring.close()
+
+
+# ============================================================
+#  PIPELINE (MAIN-PROCESS SIDE)
+# ============================================================
+
+class ProcessPipeline:
+    """
+    capture -> detect -> simulate/render across three processes.
+
+    Capture and detection run in their own processes (own GIL, own core),
+    connected by a SharedFrameRing for frames and a small queue for landmarks.
+    This process keeps simulation and rendering.
+
+    Use as a context manager: entering starts the stages and waits for the
+    first camera frame; leaving stops them, joins (terminating stragglers)
+    and frees the shared memory.
+    """
+
+    def __init__(self, slots=PIPELINE_RING_SLOTS, detect_scale=1.0, model_complexity=1,
+                 detect_every=HAND_DETECT_EVERY, startup_timeout=10.0):
+        self.slots = slots
+        self.detect_every = detect_every
+        self.startup_timeout = startup_timeout
+
+        self._ctx = multiprocessing.get_context("spawn")
+        self._stop = self._ctx.Event()
+        self._captured = self._ctx.Value("q", 0, lock=False)
+        self._detected = self._ctx.Value("q", 0, lock=False)
+        self._detect_scale = self._ctx.Value("d", detect_scale, lock=False)
+        self._complexity = self._ctx.Value("i", model_complexity, lock=False)
+        self._results = self._ctx.Queue(maxsize=4)
+
+        self.ring = None
+        self._procs = []
+
+        self._hands = {}            # label -> landmarks of the newest detection
+        self.result_stamp = None
+        self.last_inference = 0.0
+        self.detect_mode = "full"
+        self.reads = 0              # successful read_latest() calls
+        self.new_frames = 0         # ... of those, the ones that returned an unseen frame
+        self._read_seq = 0
+        self._started_at = None
+
+    # --------------------------------------------------------
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def start(self):
+        control = self._ctx.Queue()
+        ring_names = self._ctx.Queue()
+
+        capture = self._ctx.Process(
+            target=_capture_stage,
+            args=(control, ring_names, self._stop, self._captured, self.slots),
+            name="lab-capture",
+            daemon=True,
+        )
+        capture.start()
+        self._procs.append(capture)
+
+        try:
+            kind, value = control.get(timeout=self.startup_timeout)
+        except queue.Empty:
+            self.close()
+            raise RuntimeError("Camera process did not start")
+        if kind == "error":
+            self.close()
+            raise RuntimeError(value)
+
+        self.ring = SharedFrameRing(value, self.slots)
+        ring_names.put(self.ring.name)
+
+        detect = self._ctx.Process(
+            target=_detect_stage,
+            args=(self.ring.name, self.ring.shape, self.slots, self._results, self._stop,
+                  self._detected, self._detect_scale, self._complexity, self.detect_every),
+            name="lab-detect",
+            daemon=True,
+        )
+        detect.start()
+        self._procs.append(detect)
+
+        # wait for the first frame so the render loop starts with a picture
+        deadline = time.time() + self.startup_timeout
+        while self.ring.latest_seq() == 0:
+            if time.time() > deadline or not capture.is_alive():
+                self.close()
+                raise RuntimeError("Camera process produced no frames")
+            time.sleep(0.01)
+
+        self._started_at = time.time()
+        print(f"[PIPELINE] started: {len(self._procs)} worker processes, frame {self.ring.shape}")
+
+    def close(self, timeout=2.0):
+        self._stop.set()
+        for p in self._procs:
+            p.join(timeout)
+            if p.is_alive():
+                p.terminate()
+                p.join(timeout)
+        self._procs = []
+
+        if self.ring is not None:
+            print(f"[PIPELINE] {self.stats()}")
+            self.ring.close()
+            self.ring = None
+
+    # --------------------------------------------------------
+
+    def read_latest(self):
+        """
+        Non-blocking (frame, capture_time, seq) of the newest mirrored frame,
+        or None before the first one.
+
+        `frame` is a zero-copy view into the shared ring, not a copy: the
+        capture process overwrites it once it has written slots - 1 newer
+        frames. Use it within the current loop iteration, or copy it.
+        """
+        got = self.ring.view_latest()
+        if got is not None:
+            self.reads += 1
+            if got[2] != self._read_seq:
+                self._read_seq = got[2]
+                self.new_frames += 1
+        return got
+
+    def _drain(self):
+        while True:
+            try:
+                stamp, _, inference, mode, hands = self._results.get_nowait()
+            except queue.Empty:
+                return
+            self._hands = hands
+            self.result_stamp = stamp
+            self.last_inference = inference
+            self.detect_mode = mode
+
+    def result(self):
+        """
+        Raw ({label: landmarks}, stamp) of the newest detection (same contract as HandTracker.result).
+        """
+        self._drain()
+        return dict(self._hands), self.result_stamp
+
+    def age(self, now=None):
+        if self.result_stamp is None:
+            return None
+        if now is None:
+            now = time.time()
+        return now - self.result_stamp
+
+    def set_detect_scale(self, scale):
+        self._detect_scale.value = float(scale)
+
+    def set_model_complexity(self, model_complexity):
+        self._complexity.value = int(model_complexity)
+
+    def stats(self):
+        """
+        Per-stage throughput (frames/second since start). read_fps counts
+        read_latest() calls, new_frame_fps only those that returned a frame
+        not seen before; a render loop faster than the camera reads the
+        same frame more than once.
+        """
+        elapsed = max(1e-6, time.time() - (self._started_at or time.time()))
+        return {
+            "capture_fps": self._captured.value / elapsed,
+            "detect_fps": self._detected.value / elapsed,
+            "read_fps": self.reads / elapsed,
+            "new_frame_fps": self.new_frames / elapsed,
+            "inference_ms": self.last_inference * 1000.0,
+            "detect_mode": self.detect_mode,
+        }
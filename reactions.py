@@ -3,7 +3,7 @@ from utils import clamp
 from config import REACTION_DURATION, SMOKE_PARTICLES
 
 
-def trigger_reaction(slot, now):
+def trigger_reaction(slot, now, emitters=None):
     """
     Starts a reaction inside a slot if multiple chemicals have been poured.
 
@@ -11,6 +11,7 @@ def trigger_reaction(slot, now):
     - Marks the slot as 'reaction active'
     - Stores reaction start time
     - Enables smoke, glow, and other effects (handled in main loop)
+    - Registers a smoke emitter on the slot when an EmitterSystem is given
     """
 
     slot['reaction'] = {
@@ -23,4 +24,13 @@ def trigger_reaction(slot, now):
     # Reaction glow boost
     slot['glow'] = clamp(slot['glow'] + 0.3, 0.0, 1.0)
 
+    # Reaction smoke: one burst, then a thinner plume for the duration
+    if emitters is not None:
+        emitters.add(
+            ('reaction', id(slot)), 'smoke', (slot['pos'][0], slot['pos'][1]),
+            rate=SMOKE_PARTICLES / REACTION_DURATION,
+            burst=SMOKE_PARTICLES,
+            ttl=REACTION_DURATION,
+        )
+
     print("[REACTION] Reaction triggered in slot!")
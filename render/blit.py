@@ -0,0 +1,154 @@
+import math
+import weakref
+
+import cv2
+import numpy as np
+
+from render.compositing import premultiply
+
+
+# ============================================================
+#  SOURCE SPRITES (DECODED ONCE, WITH MIP LEVELS)
+# ============================================================
+
+# tool_id -> [BGRA level0, level1, ...]; one chain per tool, shared by every
+# spawned copy of it, so the table is bounded by the number of tools
+_SOURCES = {}
+
+# id(PIL image) -> (weakref to the image, levels), for images drawn without
+# a tool_id. The entry is dropped when the image is garbage collected, so
+# removed objects do not keep their mips alive and a recycled id() can
+# never return another image's chain.
+_ANON_SOURCES = {}
+
+
+def _build_levels(img):
+    level = cv2.cvtColor(np.array(img.convert("RGBA")), cv2.COLOR_RGBA2BGRA)
+    level = premultiply(level, out=level)
+    levels = [level]
+    while min(level.shape[:2]) >= 16:
+        h, w = level.shape[:2]
+        level = cv2.resize(level, (max(1, w // 2), max(1, h // 2)), interpolation=cv2.INTER_AREA)
+        levels.append(level)
+    return levels
+
+
+def source_levels(img, key=None):
+    """
+    Return the premultiplied BGRA mip chain for a PIL RGBA image.
+    Premultiplied sources filter without dark fringes at the sprite edges.
+    Each level is half the size of the previous one (INTER_AREA),
+    so a single bilinear warp never has to minify by more than 2x.
+
+    With a `key` (the tool_id) the chain is shared by every image of that
+    tool; without one it lives as long as the image does.
+    """
+    if key is not None:
+        levels = _SOURCES.get(key)
+        if levels is None:
+            levels = _SOURCES[key] = _build_levels(img)
+        return levels
+
+    entry = _ANON_SOURCES.get(id(img))
+    if entry is not None and entry[0]() is img:
+        return entry[1]
+
+    levels = _build_levels(img)
+    _ANON_SOURCES[id(img)] = (weakref.ref(img), levels)
+    weakref.finalize(img, _ANON_SOURCES.pop, id(img), None)
+    return levels
+
+
+def pick_level(levels, dst_w, dst_h):
+    """
+    Smallest mip level that is still at least as large as the destination.
+    """
+    best = levels[0]
+    for level in levels[1:]:
+        h, w = level.shape[:2]
+        if w < dst_w or h < dst_h:
+            break
+        best = level
+    return best
+
+
+# ============================================================
+#  SCRATCH BUFFER
+# ============================================================
+
+_scratch = np.zeros((0, 0, 4), dtype=np.uint8)
+
+
+def scratch_view(h, w):
+    """
+    (h, w, 4) view into a shared scratch buffer that only grows.
+    """
+    global _scratch
+    sh, sw = _scratch.shape[:2]
+    if sh < h or sw < w:
+        _scratch = np.zeros((max(h, sh), max(w, sw), 4), dtype=np.uint8)
+    return _scratch[:h, :w]
+
+
+# ============================================================
+#  SINGLE-PASS SCALE + ROTATE
+# ============================================================
+
+def rotated_bounds(w, h, angle):
+    """
+    Size of the axis-aligned box around a w x h rectangle rotated by angle (degrees).
+    """
+    a = math.radians(angle)
+    c, s = abs(math.cos(a)), abs(math.sin(a))
+    return int(math.ceil(w * c + h * s)), int(math.ceil(w * s + h * c))
+
+
+def warp_sprite(out, img, cx, cy, dst_w, dst_h, angle=0.0, interpolation=cv2.INTER_LINEAR, key=None):
+    """
+    Scale + rotate `img` (PIL RGBA) around its centre in one warpAffine,
+    writing only the part of the rotated bounding box that lands inside `out`.
+
+    Rotation follows PIL's Image.rotate convention (counter-clockwise, degrees).
+    `key` (the tool_id) shares the source mip chain between copies of a tool.
+
+    Returns (patch, x, y): a premultiplied BGRA scratch view and the top-left corner in
+    `out` where it belongs, or None when the sprite is fully off-screen.
+    The patch is only valid until the next call.
+    """
+    if dst_w <= 0 or dst_h <= 0:
+        return None
+
+    bw, bh = rotated_bounds(dst_w, dst_h, angle)
+    bx = int(round(cx - bw / 2))
+    by = int(round(cy - bh / 2))
+
+    H, W = out.shape[:2]
+    x1, y1 = max(0, bx), max(0, by)
+    x2, y2 = min(W, bx + bw), min(H, by + bh)
+    if x1 >= x2 or y1 >= y2:
+        return None
+
+    src = pick_level(source_levels(img, key), dst_w, dst_h)
+    sh, sw = src.shape[:2]
+
+    a = math.radians(angle)
+    c, s = math.cos(a), math.sin(a)
+    kx, ky = dst_w / sw, dst_h / sh
+
+    # src -> rotated box: scale, rotate about the centre, then shift so the
+    # visible ROI starts at (0, 0)
+    m00, m01 = c * kx, s * ky
+    m10, m11 = -s * kx, c * ky
+    tx = bw / 2 - (m00 * sw / 2 + m01 * sh / 2) - (x1 - bx)
+    ty = bh / 2 - (m10 * sw / 2 + m11 * sh / 2) - (y1 - by)
+    M = np.float32([[m00, m01, tx], [m10, m11, ty]])
+
+    patch = scratch_view(y2 - y1, x2 - x1)
+    cv2.warpAffine(
+        src, M, (x2 - x1, y2 - y1),
+        dst=patch,
+        flags=interpolation,
+        borderMode=cv2.BORDER_CONSTANT,
+        borderValue=0,
+    )
+    return patch, x1, y1
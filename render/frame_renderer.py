@@ -0,0 +1,121 @@
+import tracemalloc
+from collections import namedtuple
+
+import cv2
+import numpy as np
+
+
+# ============================================================
+#  PREALLOCATED, DOUBLE-BUFFERED RENDER TARGET
+# ============================================================
+
+Stage = namedtuple("Stage", ["name", "fn", "needs_scratch"])
+
+
+class FrameRenderer:
+    """
+    Owns every full-frame buffer the render chain needs:
+
+    - input:   the mirrored camera frame (cv2.flip writes straight into it)
+    - buffers: two output frames, rendered into alternately, so the frame
+               returned last time stays valid while the next one is drawn
+    - scratch: one spare frame, handed only to stages that declare they need it
+
+    Stages are called as fn(out, scratch) and must draw into `out` in place.
+    Buffers are (re)allocated only when the frame size changes, so steady
+    state does zero full-frame allocations.
+
+    With debug=True, tracemalloc also measures the peak bytes allocated
+    while the stages run (numpy allocations are traced).
+    """
+
+    def __init__(self, stages=(), debug=False):
+        self.stages = list(stages)
+        self.debug = debug
+
+        self.input = None
+        self.buffers = [None, None]
+        self.scratch = None
+        self._back = 0
+
+        self.frames = 0
+        self.bytes_allocated = 0        # by this renderer, last frame
+        self.total_bytes_allocated = 0  # by this renderer, since start
+        self.stage_alloc_peak = 0       # debug only: transient bytes in stages, last frame
+
+    def add_stage(self, name, fn, needs_scratch=False):
+        self.stages.append(Stage(name, fn, needs_scratch))
+
+    # --------------------------------------------------------
+
+    def _alloc(self, shape):
+        buf = np.empty(shape, dtype=np.uint8)
+        self.bytes_allocated += buf.nbytes
+        self.total_bytes_allocated += buf.nbytes
+        return buf
+
+    def _ensure(self, shape):
+        if self.input is not None and self.input.shape == shape:
+            return
+
+        self.input = self._alloc(shape)
+        self.buffers = [self._alloc(shape), self._alloc(shape)]
+        self.scratch = None
+        if any(st.needs_scratch for st in self.stages):
+            self.scratch = self._alloc(shape)
+
+    # --------------------------------------------------------
+
+    def prepare(self, frame, flip=True):
+        """
+        Copy (mirrored, by default) the camera frame into the input buffer.
+        """
+        self.bytes_allocated = 0
+        self._ensure(frame.shape)
+
+        if flip:
+            cv2.flip(frame, 1, dst=self.input)
+        else:
+            np.copyto(self.input, frame)
+        return self.input
+
+    def render(self, frame=None):
+        """
+        Run all stages on a copy of `frame` (default: the prepared input)
+        in the back buffer, swap, and return the finished frame.
+        """
+        if frame is None:
+            frame = self.input
+        else:
+            self.bytes_allocated = 0
+            self._ensure(frame.shape)
+
+        if self.scratch is None and any(st.needs_scratch for st in self.stages):
+            self.scratch = self._alloc(frame.shape)
+
+        out = self.buffers[self._back]
+        np.copyto(out, frame)
+
+        if self.debug:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+
+        for st in self.stages:
+            st.fn(out, self.scratch if st.needs_scratch else None)
+
+        if self.debug:
+            self.stage_alloc_peak = tracemalloc.get_traced_memory()[1] - base
+
+        self._back ^= 1
+        self.frames += 1
+        return out
+
+    def stats(self):
+        return {
+            "frames": self.frames,
+            "bytes_allocated": self.bytes_allocated,
+            "total_bytes_allocated": self.total_bytes_allocated,
+            "stage_alloc_peak": self.stage_alloc_peak,
+        }
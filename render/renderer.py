@@ -1,59 +1,92 @@
 import cv2
 import numpy as np
-from PIL import Image
 
+from config import FLAME_SPEED, RENDER_MODE
+from render.blit import warp_sprite
+from render.compositing import blend_premultiplied, blend_straight
+from render.sprite_cache import RESAMPLE_FILTERS, SPRITE_CACHE, flame_sequence
+from systems.particle_systems import SMOKE, DROPLET
 
-def overlay_image_alpha(bg, fg, x, y, alpha_mult=1.0):
-    """Overlay RGBA fg onto BGR bg."""
-    h, w = bg.shape[:2]
-    fh, fw = fg.shape[:2]
-
-    y1, y2 = max(0, y), min(h, y + fh)
-    x1, x2 = max(0, x), min(w, x + fw)
-    if y1 >= y2 or x1 >= x2:
-        return bg
+# last render_world call: objects drawn / skipped as off-screen
+world_stats = {"drawn": 0, "culled": 0}
 
-    fg_y1 = y1 - y
-    fg_y2 = fg_y1 + (y2 - y1)
-    fg_x1 = x1 - x
-    fg_x2 = fg_x1 + (x2 - x1)
+def overlay_image_alpha(bg, fg, x, y, alpha_mult=1.0):
+    """Overlay straight-alpha BGRA fg onto BGR bg (in place)."""
+    return blend_straight(bg, fg, x, y, alpha_mult)
 
-    fg_crop = fg[fg_y1:fg_y2, fg_x1:fg_x2]
-    alpha = (fg_crop[:, :, 3] / 255.0) * alpha_mult
-    alpha = alpha[..., None]
 
-    bg_patch = bg[y1:y2, x1:x2].astype(np.float32)
-    fg_rgb = fg_crop[:, :, :3].astype(np.float32)
+def blit_affine(out, img, cx, cy, w, h, angle=0.0, alpha_mult=1.0, interpolation=cv2.INTER_LINEAR, key=None):
+    """
+    Scale + rotate a PIL sprite with a single warp into the ROI of `out`
+    and blend it there. `key` is the tool_id the source mips are cached under.
+    """
+    warped = warp_sprite(out, img, cx, cy, w, h, angle, interpolation, key)
+    if warped is None:
+        return out
 
-    blended = alpha * fg_rgb + (1 - alpha) * bg_patch
-    bg[y1:y2, x1:x2] = blended.astype(np.uint8)
-    return bg
+    patch, x, y = warped
+    return blend_premultiplied(out, patch, x, y, alpha_mult)
 
 
-def render_world(frame, world_objects, BASE_SIZE):
+def render_world(frame, world_objects, BASE_SIZE, cache=None, mode=None, out=None):
     
     """
     Draw only world objects (no slots, no UI yet)
+    mode "cache":  sprites come from the transformed-sprite cache (size x quantized angle)
+    mode "affine": one warpAffine per object straight into the frame ROI
+    Both modes use the cache's resample setting (lanczos / bilinear).
+    Pass out=frame to draw in place instead of on a copy.
+    Objects entirely outside the frame are skipped (counted in world_stats).
     """
-    out = frame.copy()
+    if out is None:
+        out = frame.copy()
+    elif out is not frame:
+        np.copyto(out, frame)
+    if cache is None:
+        cache = SPRITE_CACHE
+    if mode is None:
+        mode = RENDER_MODE
+
+    H, W = out.shape[:2]
+    drawn = culled = 0
 
     for obj in world_objects:
         if not obj.get("active", True):
             continue
 
         size = int(BASE_SIZE * obj.get("scale", 1.0))
-        img = obj["img"].resize((size, size), Image.Resampling.LANCZOS)
-
-        if obj.get("current_angle", 0.0) != 0:
-            img = img.rotate(obj["current_angle"], expand=True, resample=Image.Resampling.BILINEAR)
 
-        img_np = np.array(img)
+        # half the diagonal covers the sprite at any rotation
+        px, py = obj["pos"]
+        r = size * 0.71
+        if px + r < 0 or px - r > W or py + r < 0 or py - r > H:
+            culled += 1
+            continue
+        drawn += 1
+
+        if mode == "affine":
+            out = blit_affine(
+                out, obj["img"],
+                obj["pos"][0], obj["pos"][1],
+                size, size,
+                obj.get("current_angle", 0.0),
+                obj.get("alpha", 1.0),
+                RESAMPLE_FILTERS[cache.resample][1],
+                obj.get("tool_id", obj.get("type")),
+            )
+        else:
+            img_np = cache.get(
+                obj.get("tool_id", obj.get("type")),
+                obj["img"],
+                size,
+                obj.get("current_angle", 0.0),
+            )
 
-        h, w = img_np.shape[:2]
-        x = int(obj["pos"][0] - w // 2)
-        y = int(obj["pos"][1] - h // 2)
+            h, w = img_np.shape[:2]
+            x = int(obj["pos"][0] - w // 2)
+            y = int(obj["pos"][1] - h // 2)
 
-        out = overlay_image_alpha(out, img_np, x, y, obj.get("alpha", 1.0))
+            out = blend_premultiplied(out, img_np, x, y, obj.get("alpha", 1.0))
 
         # highlight grabbed
         if obj.get("grabbed", False):
@@ -65,89 +98,134 @@ def render_world(frame, world_objects, BASE_SIZE):
                 2,
             )
 
+    world_stats["drawn"] = drawn
+    world_stats["culled"] = culled
     return out
 
 #  render_slots
 
-def render_slots(out, slot_states, SLOT_W, SLOT_H):
+def slot_rect(s, SLOT_W, SLOT_H):
     """
-    Draw slots, glow, and liquid contents
+    Screen rectangle (x1, y1, x2, y2) of a slot.
     """
-    for s in slot_states:
-        sx, sy = int(s["pos"][0]), int(s["pos"][1])
-
-        x1 = sx - SLOT_W // 2
-        y1 = sy - SLOT_H // 2
-        x2 = sx + SLOT_W // 2
-        y2 = sy + SLOT_H // 2
-
-        # slot outline
-        cv2.rectangle(out, (x1, y1), (x2, y2), (220, 220, 220), 1)
-
-        # glow
-        glow = s.get("glow", 0.0)
-        if glow > 0.01:
-            alpha = min(1.0, glow)
-            glow_color = (
-                int(180 * alpha + 60),
-                int(160 * alpha + 60),
-                int(80 * alpha + 60),
-            )
-            cv2.rectangle(out, (x1, y1), (x2, y2), glow_color, 2)
+    sx, sy = int(s["pos"][0]), int(s["pos"][1])
+    return (
+        sx - SLOT_W // 2,
+        sy - SLOT_H // 2,
+        sx + SLOT_W // 2,
+        sy + SLOT_H // 2,
+    )
 
-        # liquid contents
-        total_vol = sum(c["vol"] for c in s.get("contents", []))
-        if total_vol > 0.001:
-            r = sum(c["color"][0] * c["vol"] for c in s["contents"]) / total_vol
-            g = sum(c["color"][1] * c["vol"] for c in s["contents"]) / total_vol
-            b = sum(c["color"][2] * c["vol"] for c in s["contents"]) / total_vol
 
-            fill_h = int((SLOT_H - 10) * min(total_vol / 600.0, 1.0))
+def draw_slot(out, s, SLOT_W, SLOT_H, offset=(0, 0)):
+    """
+    Draw one slot (outline, glow, liquid) into out.
+    `offset` is subtracted from screen coordinates, so out can be a sub-view.
+    On a 4-channel (premultiplied BGRA) target everything is drawn opaque.
+    """
+    def color(c):
+        return c + (255,) if out.shape[2] == 4 else c
+
+    x1, y1, x2, y2 = slot_rect(s, SLOT_W, SLOT_H)
+    x1 -= offset[0]
+    x2 -= offset[0]
+    y1 -= offset[1]
+    y2 -= offset[1]
+
+    # slot outline
+    cv2.rectangle(out, (x1, y1), (x2, y2), color((220, 220, 220)), 1)
+
+    # glow
+    glow = s.get("glow", 0.0)
+    if glow > 0.01:
+        alpha = min(1.0, glow)
+        glow_color = (
+            int(180 * alpha + 60),
+            int(160 * alpha + 60),
+            int(80 * alpha + 60),
+        )
+        cv2.rectangle(out, (x1, y1), (x2, y2), color(glow_color), 2)
+
+    # liquid contents (SlotMixture keeps the totals and colour cached)
+    contents = s.get("contents")
+    mix = contents.color if contents is not None else None
+    if mix is not None:
+        r, g, b = mix
+        fill_h = contents.fill_height(SLOT_H - 10)
+
+        cv2.rectangle(
+            out,
+            (x1 + 6, y2 - 6 - fill_h),
+            (x2 - 6, y2 - 6),
+            color((b, g, r)),
+            -1,
+        )
+        cv2.rectangle(
+            out,
+            (x1 + 6, y2 - 6 - fill_h),
+            (x2 - 6, y2 - 6),
+            color((30, 30, 30)),
+            1,
+        )
+
+    return out
 
-            cv2.rectangle(
-                out,
-                (x1 + 6, y2 - 6 - fill_h),
-                (x2 - 6, y2 - 6),
-                (int(b), int(g), int(r)),
-                -1,
-            )
-            cv2.rectangle(
-                out,
-                (x1 + 6, y2 - 6 - fill_h),
-                (x2 - 6, y2 - 6),
-                (30, 30, 30),
-                1,
-            )
+
+def render_slots(out, slot_states, SLOT_W, SLOT_H):
+    """
+    Draw slots, glow, and liquid contents
+    """
+    for s in slot_states:
+        draw_slot(out, s, SLOT_W, SLOT_H)
 
     return out
 
 # render 
 
-def render_platform_base(out, H):
+PLATFORM_COLOR = (60, 60, 60)  # lab table gray
+PLATFORM_ALPHA = 0.45
+
+
+def platform_rect(w, H):
     """
-    Draws the lab table at a fixed screen-relative position.
+    Screen rectangle (left, top, right, bottom) of the lab table.
     """
-    h, w = out.shape[:2]
-
     # Platform position (relative to screen)
     platform_height = 220
     top = int(H * 0.62)
     bottom = top + platform_height
     left = int(w * 0.1)
     right = int(w * 0.9)
+    return left, top, right, bottom
+
+
+def render_platform_base(out, H, scratch=None):
+    """
+    Draws the lab table at a fixed screen-relative position.
+    With a preallocated `scratch` frame the blend happens in place.
+    """
+    h, w = out.shape[:2]
+    left, top, right, bottom = platform_rect(w, H)
 
-    overlay = out.copy()
+    if scratch is None:
+        overlay = out.copy()
+    else:
+        overlay = scratch
+        np.copyto(overlay, out)
 
     cv2.rectangle(
         overlay,
         (left, top),
         (right, bottom),
-        (60, 60, 60),  # lab table gray
+        PLATFORM_COLOR,
         -1,
     )
 
     # subtle blend (now that it's confirmed)
-    out = cv2.addWeighted(overlay, 0.45, out, 0.55, 0)
+    if scratch is None:
+        return cv2.addWeighted(overlay, PLATFORM_ALPHA, out, 1 - PLATFORM_ALPHA, 0)
+
+    cv2.addWeighted(overlay, PLATFORM_ALPHA, out, 1 - PLATFORM_ALPHA, 0, dst=out)
     return out
 
 
@@ -170,6 +248,7 @@ def render_toolbar(out, toolbar_img, y=0):
 def render_burner_flames(out, world_objects, dt, BASE_SIZE):
     """
     Draw animated burner flames correctly positioned above burners.
+    Frames come pre-scaled from flame_sequence(), so each burner is one blit.
     """
     for obj in world_objects:
         if obj.get("type") != "burner":
@@ -181,25 +260,21 @@ def render_burner_flames(out, world_objects, dt, BASE_SIZE):
         if not frames:
             continue
 
-        # Animate flame
-        obj["flame_timer"] += dt
-        if obj["flame_timer"] > 0.04:  # ~25 FPS
-            obj["flame_timer"] = 0.0
-            obj["flame_index"] = (obj["flame_index"] + 1) % len(frames)
-
-        flame_img = frames[obj["flame_index"]]
-
         # --- SCALE FLAME RELATIVE TO BURNER ---
         burner_size = int(BASE_SIZE * obj.get("scale", 1.0))
         flame_width = int(burner_size * 0.6)
         flame_height = int(burner_size * 0.9)
+        if flame_width <= 0 or flame_height <= 0:
+            continue
 
-        flame_img = flame_img.resize(
-            (flame_width, flame_height),
-            Image.Resampling.LANCZOS,
-        )
+        sequence = flame_sequence(frames, flame_width, flame_height)
+
+        # Animate flame: one frame every FLAME_SPEED seconds
+        n = len(sequence)
+        obj["flame_timer"] = (obj["flame_timer"] + dt) % (FLAME_SPEED * n)
+        obj["flame_index"] = int(obj["flame_timer"] / FLAME_SPEED) % n
 
-        flame_np = np.array(flame_img)
+        flame_np = sequence[obj["flame_index"]]
 
         # --- POSITION FLAME ABOVE BURNER ---
         x = int(obj["pos"][0] - flame_width // 2)
@@ -210,7 +285,7 @@ def render_burner_flames(out, world_objects, dt, BASE_SIZE):
         # Place flame slightly above burner top
         y = int(burner_top_y - flame_height + 10)
 
-        out = overlay_image_alpha(out, flame_np, x, y, 1.0)
+        out = blend_premultiplied(out, flame_np, x, y)
 
     return out
 
@@ -220,31 +295,49 @@ def render_burner_flames(out, world_objects, dt, BASE_SIZE):
 
 def render_particles(out, particles):
     """
-    Draw smoke and droplet particles.
+    Draw smoke and droplet particles from a ParticlePool.
+    Smoke is blended only inside each particle's bounding box, so the cost
+    follows particle count x particle size instead of frame size.
     """
-    for p in particles:
-        x, y = int(p["pos"][0]), int(p["pos"][1])
+    h, w = out.shape[:2]
+    n = particles.count
+    if n == 0:
+        return out
 
-        if p["type"] == "smoke":
-            alpha = max(0.0, min(1.0, p["life"] / 2.0))
-            radius = int(p["size"] * alpha)
+    # one conversion per column instead of per-particle numpy indexing
+    pos = particles.pos[:n].astype(np.int32).tolist()
+    life = particles.life[:n].tolist()
+    size = particles.size[:n].tolist()
+    color = particles.color[:n].tolist()
+    kind = particles.type[:n].tolist()
+
+    for (x, y), p_life, p_size, p_color, p_kind in zip(pos, life, size, color, kind):
+        if p_kind == SMOKE:
+            alpha = max(0.0, min(1.0, p_life / 2.0))
+            radius = int(p_size * alpha)
             if radius > 1:
-                overlay = out.copy()
+                x1, y1 = max(0, x - radius), max(0, y - radius)
+                x2, y2 = min(w, x + radius + 1), min(h, y + radius + 1)
+                if x1 >= x2 or y1 >= y2:
+                    continue
+
+                roi = out[y1:y2, x1:x2]
+                overlay = roi.copy()
                 cv2.circle(
                     overlay,
-                    (x, y),
+                    (x - x1, y - y1),
                     radius,
-                    p["color"],
+                    tuple(p_color),
                     -1,
                 )
-                out = cv2.addWeighted(overlay, alpha * 0.6, out, 1 - alpha * 0.6, 0)
+                cv2.addWeighted(overlay, alpha * 0.6, roi, 1 - alpha * 0.6, 0, dst=roi)
 
-        elif p["type"] == "droplet":
+        elif p_kind == DROPLET:
             cv2.circle(
                 out,
                 (x, y),
-                p["size"],
-                p["color"],
+                int(p_size),
+                tuple(p_color),
                 -1,
             )
 
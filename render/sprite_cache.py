@@ -0,0 +1,180 @@
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from config import SPRITE_ANGLE_STEP, SPRITE_CACHE_MAX_BYTES
+from render.compositing import premultiply
+from tools import TOOLS, load_tool_image
+
+
+# resample name -> (PIL filter for the cache, cv2 flag for affine mode)
+# affine mode already filters through mip levels, so its steps are one notch lower
+RESAMPLE_FILTERS = {
+    "lanczos": (Image.Resampling.LANCZOS, cv2.INTER_LINEAR),
+    "bilinear": (Image.Resampling.BILINEAR, cv2.INTER_NEAREST),
+}
+
+
+# ============================================================
+#  ANGLE QUANTIZATION
+# ============================================================
+
+def quantize_angle(angle, step=SPRITE_ANGLE_STEP):
+    """
+    Snap an angle (degrees) to the cache step and wrap it into [0, 360).
+    A step <= 0 disables snapping.
+    """
+    if step > 0:
+        angle = round(angle / step) * step
+    angle = float(angle) % 360.0
+    if angle == 360.0:
+        angle = 0.0
+    return angle
+
+
+# ============================================================
+#  TRANSFORMED SPRITE CACHE
+# ============================================================
+
+class SpriteCache:
+    """
+    LRU cache of resized + rotated tool sprites.
+
+    Key:   (tool_id, rendered size, quantized angle)
+    Value: premultiplied BGRA uint8 numpy array, ready for blend_premultiplied.
+    """
+
+    def __init__(self, max_bytes=SPRITE_CACHE_MAX_BYTES, angle_step=SPRITE_ANGLE_STEP, resample="lanczos"):
+        self.max_bytes = max_bytes
+        self.angle_step = angle_step
+        self.resample = resample
+
+        self._entries = OrderedDict()
+        self.bytes_used = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def key(self, tool_id, size, angle=0.0):
+        return (tool_id, int(size), quantize_angle(angle, self.angle_step))
+
+    def get(self, tool_id, img, size, angle=0.0):
+        """
+        Return the sprite for tool_id at (size, angle), building it
+        from the PIL image `img` on a miss.
+        """
+        key = self.key(tool_id, size, angle)
+
+        sprite = self._entries.get(key)
+        if sprite is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return sprite
+
+        self.misses += 1
+        sprite = self._build(img, key[1], key[2])
+        self._store(key, sprite)
+        return sprite
+
+    def prewarm(self, tool_ids=None, sizes=(100,), angles=(0.0,)):
+        """
+        Pre-render sprites for the tools listed in tools.TOOLS (or tool_ids)
+        so the first frames after startup don't pay for the resizes.
+        """
+        if tool_ids is None:
+            tool_ids = [t["id"] for t in TOOLS]
+
+        for tool_id in tool_ids:
+            img = load_tool_image(tool_id)
+            for size in sizes:
+                for angle in angles:
+                    key = self.key(tool_id, size, angle)
+                    if key not in self._entries:
+                        self._store(key, self._build(img, key[1], key[2]))
+
+    def set_resample(self, resample):
+        """
+        Switch the resize filter ("lanczos" / "bilinear").
+        Cached sprites were built with the old filter, so they are dropped.
+        """
+        if resample != self.resample:
+            self.resample = resample
+            self.clear()
+
+    def clear(self):
+        self._entries.clear()
+        self.bytes_used = 0
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self.bytes_used,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+    # --------------------------------------------------------
+
+    def _build(self, img, size, angle):
+        img = img.resize((size, size), RESAMPLE_FILTERS[self.resample][0])
+
+        if angle != 0:
+            img = img.rotate(angle, expand=True, resample=Image.Resampling.BILINEAR)
+
+        bgra = cv2.cvtColor(np.array(img), cv2.COLOR_RGBA2BGRA)
+        return premultiply(bgra, out=bgra)
+
+    def _store(self, key, sprite):
+        # sprites larger than the whole budget are returned but never kept
+        if sprite.nbytes > self.max_bytes:
+            return
+
+        self._entries[key] = sprite
+        self.bytes_used += sprite.nbytes
+
+        while self.bytes_used > self.max_bytes:
+            _, old = self._entries.popitem(last=False)
+            self.bytes_used -= old.nbytes
+            self.evictions += 1
+
+
+# shared instance used by render_world
+SPRITE_CACHE = SpriteCache()
+
+
+# ============================================================
+#  PRE-SCALED FLAME SEQUENCES
+# ============================================================
+
+# (id(frames), w, h) -> (frames, [premultiplied BGRA frame, ...])
+# the source list is kept in the value so its id() can't be reused
+_FLAME_SEQUENCES = {}
+
+
+def flame_sequence(frames, w, h):
+    """
+    The whole flame animation resized to (w, h), built once and shared
+    by every burner drawn at that size.
+    """
+    key = (id(frames), w, h)
+    entry = _FLAME_SEQUENCES.get(key)
+    if entry is not None and entry[0] is frames:
+        return entry[1]
+
+    scaled = []
+    for img in frames:
+        img = img.resize((w, h), Image.Resampling.LANCZOS)
+        bgra = cv2.cvtColor(np.array(img), cv2.COLOR_RGBA2BGRA)
+        scaled.append(premultiply(bgra, out=bgra))
+
+    _FLAME_SEQUENCES[key] = (frames, scaled)
+    return scaled
@@ -0,0 +1,219 @@
+import numpy as np
+
+from render.compositing import blend_split, split_premultiplied
+from render.renderer import (
+    PLATFORM_ALPHA,
+    PLATFORM_COLOR,
+    draw_slot,
+    platform_rect,
+    slot_rect,
+)
+
+
+# ============================================================
+#  STATIC OVERLAY LAYER (PLATFORM + SLOTS + TOOLBAR)
+# ============================================================
+
+SLOT_MARGIN = 2  # glow outline is 2px thick and spills 1px outside the slot
+
+
+def _intersect(a, b):
+    x1, y1 = max(a[0], b[0]), max(a[1], b[1])
+    x2, y2 = min(a[2], b[2]), min(a[3], b[3])
+    if x1 >= x2 or y1 >= y2:
+        return None
+    return x1, y1, x2, y2
+
+
+def _table_bounds(w, h):
+    # cv2.rectangle includes the right/bottom edge, slicing does not
+    left, top, right, bottom = platform_rect(w, h)
+    return left, top, right + 1, bottom + 1
+
+
+def _merge_rects(rects):
+    """
+    Merge overlapping rectangles until the list is disjoint,
+    so no pixel is composited twice.
+    """
+    rects = list(rects)
+    merged = True
+    while merged:
+        merged = False
+        for i in range(len(rects)):
+            for j in range(i + 1, len(rects)):
+                if _intersect(rects[i], rects[j]) is not None:
+                    a, b = rects[i], rects.pop(j)
+                    rects[i] = (
+                        min(a[0], b[0]), min(a[1], b[1]),
+                        max(a[2], b[2]), max(a[3], b[3]),
+                    )
+                    merged = True
+                    break
+            if merged:
+                break
+    return rects
+
+
+class StaticLayer:
+    """
+    Pre-rendered premultiplied BGRA layer holding everything that does not
+    move between frames: the lab table, slot outlines/liquids and the toolbar.
+
+    The layer is rebuilt only when the frame size or slot layout changes.
+    Slot content changes repaint just that slot's rectangle, either detected
+    automatically or signalled with invalidate_slot().
+    """
+
+    def __init__(self, slot_w, slot_h):
+        self.slot_w = slot_w
+        self.slot_h = slot_h
+
+        self.layer = None
+        self.color = None
+        self.inv_alpha = None
+        self._size = None
+        self._layout = None
+        self._slot_states = []
+        self._slot_keys = []
+        self._dirty_slots = set()
+        self._toolbar = None
+        self._regions = []
+
+        self.full_rebuilds = 0
+        self.partial_repaints = 0
+
+    # --------------------------------------------------------
+    # invalidation events
+    # --------------------------------------------------------
+
+    def invalidate(self):
+        """
+        Force a full rebuild on the next render.
+        """
+        self._size = None
+
+    def invalidate_slot(self, index):
+        """
+        Repaint one slot rectangle on the next render (for changes the slot
+        key does not see; SlotMixture changes are picked up by version).
+        """
+        self._dirty_slots.add(index)
+
+    # --------------------------------------------------------
+
+    def render(self, out, slot_states, toolbar_img=None):
+        """
+        Composite the cached layer onto out (in place) and return it.
+        """
+        h, w = out.shape[:2]
+        layout = tuple(slot_rect(s, self.slot_w, self.slot_h) for s in slot_states)
+
+        if self._size != (h, w) or self._layout != layout:
+            self._rebuild(h, w, layout, slot_states, toolbar_img)
+        else:
+            self._update(slot_states, toolbar_img)
+
+        for x1, y1, x2, y2 in self._regions:
+            blend_split(
+                out[y1:y2, x1:x2],
+                self.color[y1:y2, x1:x2],
+                self.inv_alpha[y1:y2, x1:x2],
+            )
+        return out
+
+    # --------------------------------------------------------
+
+    def _slot_key(self, s):
+        contents = s.get("contents")
+        return (round(min(1.0, s.get("glow", 0.0)), 3), contents.version if contents is not None else 0)
+
+    def _slot_bounds(self, rect):
+        m = SLOT_MARGIN
+        return rect[0] - m, rect[1] - m, rect[2] + m + 1, rect[3] + m + 1
+
+    def _toolbar_bounds(self, toolbar_img):
+        th, tw = toolbar_img.shape[:2]
+        return 0, 0, tw, th
+
+    def _rebuild(self, h, w, layout, slot_states, toolbar_img):
+        if self.layer is None or self.layer.shape[:2] != (h, w):
+            self.layer = np.zeros((h, w, 4), dtype=np.uint8)
+            self.color = np.zeros((h, w, 3), dtype=np.uint8)
+            self.inv_alpha = np.zeros((h, w, 3), dtype=np.uint8)
+
+        self._size = (h, w)
+        self._layout = layout
+        self._slot_states = slot_states
+        self._slot_keys = [self._slot_key(s) for s in slot_states]
+        self._dirty_slots.clear()
+        self._toolbar = toolbar_img
+
+        self._paint((0, 0, w, h))
+
+        rects = [_table_bounds(w, h)] + [self._slot_bounds(r) for r in layout]
+        if toolbar_img is not None:
+            rects.append(self._toolbar_bounds(toolbar_img))
+        rects = [_intersect(r, (0, 0, w, h)) for r in rects]
+        self._regions = _merge_rects(r for r in rects if r is not None)
+
+        self.full_rebuilds += 1
+
+    def _update(self, slot_states, toolbar_img):
+        self._slot_states = slot_states
+        dirty = []
+
+        for i, s in enumerate(slot_states):
+            key = self._slot_key(s)
+            if key != self._slot_keys[i] or i in self._dirty_slots:
+                self._slot_keys[i] = key
+                dirty.append(self._slot_bounds(self._layout[i]))
+        self._dirty_slots.clear()
+
+        if toolbar_img is not self._toolbar:
+            old, self._toolbar = self._toolbar, toolbar_img
+            for img in (old, toolbar_img):
+                if img is not None:
+                    dirty.append(self._toolbar_bounds(img))
+
+        h, w = self._size
+        for rect in dirty:
+            rect = _intersect(rect, (0, 0, w, h))
+            if rect is not None:
+                self._paint(rect)
+                self.partial_repaints += 1
+
+    def _paint(self, rect):
+        """
+        Repaint one rectangle of the layer from scratch:
+        table, then slots, then toolbar (same order as the old render chain).
+        """
+        x1, y1, x2, y2 = rect
+        view = self.layer[y1:y2, x1:x2]
+        view[:] = 0
+
+        h, w = self._size
+        table = _intersect(_table_bounds(w, h), rect)
+        if table is not None:
+            a = int(round(PLATFORM_ALPHA * 255))
+            view[table[1] - y1:table[3] - y1, table[0] - x1:table[2] - x1] = (
+                tuple(int(round(c * PLATFORM_ALPHA)) for c in PLATFORM_COLOR) + (a,)
+            )
+
+        for s, srect in zip(self._slot_states, self._layout):
+            if _intersect(self._slot_bounds(srect), rect) is not None:
+                draw_slot(view, s, self.slot_w, self.slot_h, offset=(x1, y1))
+
+        if self._toolbar is not None:
+            bar = _intersect(self._toolbar_bounds(self._toolbar), rect)
+            if bar is not None:
+                view[bar[1] - y1:bar[3] - y1, bar[0] - x1:bar[2] - x1, :3] = (
+                    self._toolbar[bar[1]:bar[3], bar[0]:bar[2]]
+                )
+                view[bar[1] - y1:bar[3] - y1, bar[0] - x1:bar[2] - x1, 3] = 255
+
+        split_premultiplied(
+            view,
+            color=self.color[y1:y2, x1:x2],
+            inv_alpha=self.inv_alpha[y1:y2, x1:x2],
+        )
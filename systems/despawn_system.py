@@ -0,0 +1,135 @@
+import numpy as np
+
+from config import BASE_SIZE, SLOT_W, SLOT_H, WORLD_MAX_OBJECTS, DESPAWN_OFFSCREEN_TIME, DESPAWN_MARGIN
+from systems.collision_system import wake_touching
+
+
+def in_slots(pos, slot_states, floor_y=None, slot_w=SLOT_W, slot_h=SLOT_H):
+    """
+    (N,) mask of positions inside a slot: between its side walls and from
+    its top edge down to its bottom edge. Slots are open at the bottom, so
+    with `floor_y` below the slot an object resting on the floor between
+    the walls also counts; anything deeper does not.
+    """
+    inside = np.zeros(len(pos), dtype=bool)
+    for s in slot_states:
+        x, y = float(s["pos"][0]), float(s["pos"][1])
+        bottom = y + slot_h / 2 if floor_y is None else max(y + slot_h / 2, floor_y)
+        inside |= (
+            (np.abs(pos[:, 0] - x) < slot_w / 2)
+            & (pos[:, 1] > y - slot_h / 2) & (pos[:, 1] <= bottom)
+        )
+    return inside
+
+
+def update(store, dt, W, H, slot_states=(), floor_y=None, max_objects=WORLD_MAX_OBJECTS,
+           offscreen_time=DESPAWN_OFFSCREEN_TIME, margin=DESPAWN_MARGIN):
+    """
+    Remove objects nobody will miss, so a long session does not keep
+    growing the world. Call once per frame.
+
+    - an object off-screen (beyond `margin`) for `offscreen_time` seconds
+      is removed
+    - above `max_objects`, the objects held longest ago go first (LRU)
+
+    Held objects and objects sitting in one of `slot_states` (see
+    in_slots) are never removed. Returns the removed objects, so their emitters etc. can be
+    dropped too.
+    """
+    n = store.size
+    live = store.used[:n] & store.active[:n]
+
+    idle = store.idle[:n]
+    idle[live] += dt
+    idle[store.grabbed[:n]] = 0.0
+
+    pos = store.pos[:n]
+    reach = BASE_SIZE * store.scale[:n] / 2 + margin
+    out = (
+        (pos[:, 0] + reach < 0) | (pos[:, 0] - reach > W)
+        | (pos[:, 1] + reach < 0) | (pos[:, 1] - reach > H)
+    )
+    offscreen = store.offscreen[:n]
+    offscreen[live & out] += dt
+    offscreen[~out] = 0.0
+
+    removable = live & ~store.grabbed[:n] & ~in_slots(pos, slot_states, floor_y)
+
+    doomed = set(np.flatnonzero(removable & (offscreen >= offscreen_time)).tolist())
+
+    excess = int(live.sum()) - len(doomed) - max_objects
+    if excess > 0:
+        rest = np.flatnonzero(removable)
+        rest = rest[~np.isin(rest, list(doomed))]
+        oldest = rest[np.argsort(-idle[rest], kind="stable")[:excess]]
+        doomed.update(oldest.tolist())
+
+    if not doomed:
+        return []
+
+    removed = [obj for obj in store if obj.handle in doomed]
+    wake_touching(store, np.array(sorted(doomed)))
+    for obj in removed:
+        store.remove(obj)
+    return removed
+
+
+# ============================================================
+#  DEMO: A LONG SESSION
+# ============================================================
+
+if __name__ == "__main__":
+    import time
+
+    from physics import apply_gravity_all
+    from systems import collision_system
+    from systems.motion_system import update_store
+    from world_store import WorldStore
+
+    W, H = 1280, 720
+    floor_y = H - 80
+    step = 1 / 120
+    rng = np.random.default_rng(0)
+
+    slots = [{"pos": np.array([W / 2 + dx, H * 0.8])} for dx in (-220, 0, 220)]
+
+    store = WorldStore()
+    # dropped into the middle slot first and never touched again, so it is
+    # always the least recently used object
+    slotted = store.append({"pos": (W / 2, H * 0.8), "vel": (0.0, 0.0), "scale": 0.8})
+    first_free = store.append({"pos": (150.0, floor_y), "vel": (0.0, 0.0), "scale": 0.8})
+
+    frames = 60 * 60 * 20           # 20 minutes at 60 fps, a new tool every 3 s
+    sim_time = 0.0
+    t_start = time.perf_counter()
+    for frame in range(frames):
+        if frame % 180 == 0:
+            # most land on the bench, some get flung off the side
+            x = rng.uniform(100, W - 100)
+            vx = rng.choice((0.0, 0.0, 0.0, 1500.0))
+            store.append({"pos": (x, 100.0), "vel": (vx, 0.0), "scale": 0.8})
+
+        t0 = time.perf_counter()
+        for _ in range(2):
+            apply_gravity_all(store, step, floor_y)
+            collision_system.update(store, step, floor_y, slots)
+            update_store(store, step, lambda obj: None)
+        sim_time += time.perf_counter() - t0
+        update(store, 1 / 60, W, H, slots, floor_y)
+
+        if (frame + 1) % (60 * 60 * 4) == 0:
+            c = store.counts()
+            print(f"  {(frame + 1) // 3600:2d} min: {c['objects']:3d} objects "
+                  f"({c['awake']} awake, {c['asleep']} asleep), store rows {store.size}")
+
+    print(f"20 min session: {(time.perf_counter() - t_start):.1f} s wall, "
+          f"simulation {sim_time / frames * 1e3:.3f} ms/frame on average")
+
+    # LRU eviction took the oldest free object but not the one in the slot
+    assert first_free not in list(store), "the oldest free object should have been evicted"
+    assert slotted in list(store), "an object in a slot must survive LRU eviction"
+    assert in_slots(store.pos[[slotted.handle]], slots, floor_y)[0]
+    # under a slot but below the floor, or at the left screen edge, is not in it
+    probe = np.array([[W / 2, floor_y + 300.0], [10.0, floor_y], [0.0, 0.0]])
+    assert not in_slots(probe, slots, floor_y).any()
+    print(f"  slotted object kept at {np.round(slotted['pos']).tolist()}, oldest free object evicted")
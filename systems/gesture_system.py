@@ -0,0 +1,244 @@
+import math
+
+from config import (
+    GRAB_ENTER_RATIO,
+    GRAB_EXIT_RATIO,
+    POUR_ENTER_DEG,
+    POUR_EXIT_DEG,
+    GESTURE_DEBOUNCE,
+)
+
+GESTURES = ("grab", "pour")
+
+
+class GestureClassifier:
+    """
+    Runtime version of auto_selection_gesture.classify_pose.
+
+    Works on HandFeatures: the pinch ratio is measured in palm widths and
+    the tilt is the hand's angle from upright, so the thresholds do not
+    depend on camera resolution or hand distance.
+    Grab and pour are tracked separately, so a held flask can be tilted to
+    pour.
+
+    Each gesture has an enter and an exit threshold (hysteresis). A change
+    must also hold for GESTURE_DEBOUNCE seconds (debounce). update()
+    returns events instead of per-frame booleans:
+
+        (label, "grab_start") / (label, "grab_end")
+        (label, "pour_start") / (label, "pour_end")
+
+    A hand that disappears ends its active gestures.
+    """
+
+    def __init__(self, grab_enter=GRAB_ENTER_RATIO, grab_exit=GRAB_EXIT_RATIO,
+                 pour_enter=POUR_ENTER_DEG, pour_exit=POUR_EXIT_DEG, debounce=GESTURE_DEBOUNCE):
+        self.grab_enter = grab_enter
+        self.grab_exit = grab_exit
+        self.pour_enter = pour_enter
+        self.pour_exit = pour_exit
+        self.debounce = debounce
+
+        # label -> {gesture: active}, and (label, gesture) -> time the change was first seen
+        self.state = {}
+        self._pending = {}
+
+    def active(self, label, gesture):
+        s = self.state.get(label)
+        return bool(s and s[gesture])
+
+    def _step(self, label, gesture, active, want, now, events):
+        key = (label, gesture)
+        if want == active:
+            self._pending.pop(key, None)
+            return active
+
+        since = self._pending.setdefault(key, now)
+        if now - since < self.debounce:
+            return active
+
+        del self._pending[key]
+        events.append((label, gesture + ("_start" if want else "_end")))
+        return want
+
+    def update(self, hands, now):
+        """
+        hands: {label: HandFeatures}. Returns this frame's list of (label, event).
+        """
+        events = []
+
+        for label in list(self.state):
+            if label in hands:
+                continue
+            for gesture in GESTURES:
+                if self.state[label][gesture]:
+                    events.append((label, gesture + "_end"))
+                self._pending.pop((label, gesture), None)
+            del self.state[label]
+
+        for label, hand in hands.items():
+            s = self.state.get(label)
+            if s is None:
+                s = self.state[label] = {"grab": False, "pour": False}
+
+            ratio = hand.pinch_ratio
+            grab = ratio < self.grab_enter if not s["grab"] else ratio < self.grab_exit
+            s["grab"] = self._step(label, "grab", s["grab"], grab, now, events)
+
+            tilt = abs(math.degrees(hand.tilt))
+            pour = tilt > self.pour_enter if not s["pour"] else tilt > self.pour_exit
+            s["pour"] = self._step(label, "pour", s["pour"], pour, now, events)
+
+        return events
+
+
+# ============================================================
+#  BENCHMARK / LABELLED-SEQUENCE CHECK
+# ============================================================
+
+def _synthetic_hand(pinch, tilt_deg, rng, noise=0.004):
+    """
+    Normalized (21, 3) landmarks of an upright open hand. `pinch` (0..1)
+    moves the thumb tip onto the index tip. The whole hand is rotated by
+    tilt_deg about the wrist, and MediaPipe-like jitter is added.
+    """
+    import numpy as np
+
+    lm = np.zeros((21, 3), dtype=np.float32)
+    for j in range(4):
+        lm[1 + j] = (-0.06 - 0.05 * j, -0.03 - 0.04 * j, 0.0)          # thumb, out to the side
+        for f, x in enumerate((-0.045, 0.0, 0.045, 0.09)):
+            lm[5 + f * 4 + j] = (x * (1 + 0.2 * j), -0.1 - 0.05 * j, 0.0)
+    lm[4] = lm[4] + (lm[8] - lm[4]) * pinch
+
+    t = math.radians(tilt_deg)
+    rot = np.array([[math.cos(t), -math.sin(t)], [math.sin(t), math.cos(t)]], dtype=np.float32)
+    lm[:, :2] = lm[:, :2] @ rot.T
+    lm[:, :2] += (0.5, 0.7)
+    lm[:, :2] += rng.normal(0.0, noise, (21, 2))
+    return lm
+
+
+def _labelled_sequence(fps=30.0, seed=3):
+    """
+    Scripted hand: idle, grab, carrying with a loosened pinch, pour, tilt
+    eased back, level again, release, tilt with an open hand.
+    Returns (stamps, landmarks, labels), where labels are (grab, pour) per frame.
+    """
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    script = [
+        # seconds, pinch amount, tilt, expected grab, expected pour
+        (1.0, 0.0, 0.0, False, False),
+        (0.5, 0.9, 0.0, True, False),
+        (1.0, 0.32, 0.0, True, False),      # pinch loosened to between exit and enter
+        (1.0, 0.9, 45.0, True, True),
+        (0.7, 0.9, 21.0, True, True),       # tilt eased back to between exit and enter
+        (1.0, 0.9, 0.0, True, False),
+        (1.0, 0.0, 0.0, False, False),
+        (1.0, 0.0, 40.0, False, True),
+    ]
+
+    stamps, frames, labels = [], [], []
+    t = 0.0
+    for seconds, pinch, tilt, grab, pour in script:
+        for _ in range(int(seconds * fps)):
+            frames.append(_synthetic_hand(pinch, tilt, rng))
+            labels.append((grab, pour))
+            stamps.append(t)
+            t += 1.0 / fps
+    return stamps, frames, labels
+
+
+def _flicker_sequence(W, H, fps=30.0, seconds=3.0, seed=5):
+    """
+    A still hand whose pinch ratio sits right on GRAB_ENTER_RATIO, so
+    landmark jitter alone pushes it back and forth across the threshold.
+    Returns (stamps, landmarks).
+    """
+    import numpy as np
+
+    from hand_features import extract
+
+    def ratio(pinch):
+        lm = _synthetic_hand(pinch, 0.0, np.random.default_rng(0), noise=0.0)
+        return extract({"Right": lm}, W, H)["Right"].pinch_ratio
+
+    # the ratio falls as the pinch closes; bisect for the threshold
+    lo, hi = 0.0, 1.0
+    for _ in range(30):
+        mid = 0.5 * (lo + hi)
+        lo, hi = (mid, hi) if ratio(mid) > GRAB_ENTER_RATIO else (lo, mid)
+
+    rng = np.random.default_rng(seed)
+    n = int(seconds * fps)
+    return [i / fps for i in range(n)], [_synthetic_hand(lo, 0.0, rng) for _ in range(n)]
+
+
+def _evaluate(classifier, stamps, features, labels=None, settle=0.15):
+    """
+    Per-frame accuracy (ignoring `settle` seconds after each label change)
+    and the events emitted, in order. Without labels only the events count.
+    """
+    correct = total = 0
+    events = []
+    changed_at = stamps[0]
+    for i, (now, hand) in enumerate(zip(stamps, features)):
+        events += classifier.update({"Right": hand}, now)
+        if labels is None:
+            continue
+
+        if i and labels[i] != labels[i - 1]:
+            changed_at = now
+        if now - changed_at < settle:
+            continue
+        total += 1
+        want = labels[i]
+        got = (classifier.active("Right", "grab"), classifier.active("Right", "pour"))
+        correct += got == want
+    return (correct / total if total else None), [event for _, event in events]
+
+
+if __name__ == "__main__":
+    import time
+
+    from hand_features import extract
+
+    W, H = 1280, 720
+
+    def single_threshold():
+        return GestureClassifier(grab_exit=GRAB_ENTER_RATIO, pour_exit=POUR_ENTER_DEG, debounce=0.0)
+
+    # scripted sequence: every frame right once settled, one event per change
+    stamps, frames, labels = _labelled_sequence()
+    features = [extract({"Right": lm}, W, H)["Right"] for lm in frames]
+
+    acc, events = _evaluate(GestureClassifier(), stamps, features, labels)
+    print(f"hysteresis + debounce: accuracy {acc * 100:.1f}%   events {events}")
+    assert acc >= 0.99, acc
+    assert events == ["grab_start", "pour_start", "pour_end", "grab_end", "pour_start"], events
+
+    raw_acc, raw_events = _evaluate(single_threshold(), stamps, features, labels)
+    print(f"single threshold:      accuracy {raw_acc * 100:.1f}%   events {len(raw_events)}")
+    assert raw_acc < acc
+
+    # a hand resting on the grab threshold: the single threshold chatters,
+    # hysteresis + debounce give at most one grab that then holds
+    stamps, frames = _flicker_sequence(W, H)
+    features = [extract({"Right": lm}, W, H)["Right"] for lm in frames]
+
+    _, events = _evaluate(GestureClassifier(), stamps, features)
+    _, raw_events = _evaluate(single_threshold(), stamps, features)
+    print(f"on the threshold:      hysteresis {len(events)} events, single threshold {len(raw_events)}")
+    assert events in ([], ["grab_start"]), events
+    assert len(raw_events) >= 10, raw_events
+
+    # both hands, per frame
+    clf = GestureClassifier()
+    both = {"Left": features[40], "Right": features[70]}
+    n = 20000
+    t0 = time.perf_counter()
+    for i in range(n):
+        clf.update(both, i / 30.0)
+    print(f"update (2 hands): {(time.perf_counter() - t0) / n * 1e6:.2f} us")
@@ -10,8 +10,8 @@ def try_grab(obj, hand, label):
     """
     obj["grabbed"] = True
     obj["grabbed_by"] = label
-    obj["grab_offset"] = obj["pos"] - hand["wrist"]
-    obj["grab_angle"] = obj["current_angle"] - hand["angle"]
+    obj["grab_offset"] = obj["pos"] - hand.wrist
+    obj["grab_angle"] = obj["current_angle"] - hand.angle
 
 
 def release(obj):
@@ -24,41 +24,197 @@ def release(obj):
     obj["grab_angle"] = None
 
 
-def update(hands, world_objects):
+def _free(obj):
+    return not obj.get("grabbed") and obj.get("active", True)
+
+
+def _candidates(point, world_objects, index):
     """
-    Main grab system update.
+    [(distance_sq, obj)] for the free objects within GRAB_RADIUS of point.
+    Uses the spatial index when there is one, else one vectorized scan.
     """
-    if not hands:
-        return
+    if index is not None:
+        return [(d, obj) for d, obj in index.query_radius(point, GRAB_RADIUS ** 0.5) if _free(obj)]
 
-    for label, hand in hands.items():
-        pinch = hand["pinch"]
+    free = [obj for obj in world_objects if _free(obj)]
+    if not free:
+        return []
+    d = np.array([obj["pos"] for obj in free], dtype=float) - point
+    d = d[:, 0] * d[:, 0] + d[:, 1] * d[:, 1]
+    return [(d[k], free[k]) for k in np.flatnonzero(d < GRAB_RADIUS)]
+
+
+class GrabSystem:
+    """
+    Grabbing and carrying objects with the hands; call update() once per
+    frame.
+
+    Objects are only searched on grab_start. Held objects follow their
+    hand through the `held` table (label -> object) without scanning
+    world_objects.
+    """
+
+    def __init__(self):
+        self.held = {}
+
+    def _start_grabs(self, hands, labels, world_objects, index=None):
+        """
+        Give every starting hand the nearest free object in GRAB_RADIUS. When
+        both hands want the same object, the closer hand wins (ties: label
+        order) and the other takes its next-nearest candidate.
+        """
+        pairs = []
+        for label in labels:
+            for d, obj in _candidates(hands[label].wrist, world_objects, index):
+                pairs.append((d, label, obj))
+        # stable sort: equal (distance, label) keep the query's order
+        pairs.sort(key=lambda p: p[:2])
+
+        for _, label, obj in pairs:
+            if label in self.held or obj.get("grabbed"):
+                continue
+            try_grab(obj, hands[label], label)
+            self.held[label] = obj
+
+    def update(self, hands, world_objects, events=(), index=None):
+        """
+        hands:  {label: HandFeatures} (see hand_features.extract)
+        events: [(label, "grab_start" / "grab_end")] from GestureClassifier.update
+        index:  optional SpatialGrid over world_objects for the nearest-object query
+        """
+        held = self.held
+        starting = []
+        for label, event in events:
+            if event == "grab_end":
+                obj = held.pop(label, None)
+                if obj is not None:
+                    release(obj)
+            elif event == "grab_start" and label in hands and label not in held:
+                starting.append(label)
+
+        for label, obj in list(held.items()):
+            if obj.get("grabbed_by") != label:
+                del held[label]         # released elsewhere
+            elif label not in hands:
+                del held[label]         # hand vanished without an end event
+                release(obj)
+
+        if starting:
+            self._start_grabs(hands, sorted(starting), world_objects, index)
+
+        for label, obj in held.items():
+            hand = hands[label]
+
+            # Smooth position follow
+            target_pos = hand.wrist + obj["grab_offset"]
+            obj["pos"] += (target_pos - obj["pos"]) * 0.35
+
+            # Smooth rotation
+            target_angle = hand.angle + obj["grab_angle"]
+            obj["current_angle"] += (target_angle - obj["current_angle"]) * 0.25
 
-        # ---------- TRY GRAB ----------
-        if pinch:
+
+# ============================================================
+#  BENCHMARK
+# ============================================================
+
+def _scan_update(hands, world_objects):
+    """
+    The previous per-frame implementation (first object in range, full
+    scans per hand), kept for the benchmark.
+    """
+    for label, hand in hands.items():
+        if hand.pinch:
             for obj in world_objects:
                 if obj.get("grabbed"):
                     continue
-
-                if distance_sq(obj["pos"], hand["wrist"]) < GRAB_RADIUS:
+                if distance_sq(obj["pos"], hand.wrist) < GRAB_RADIUS:
                     try_grab(obj, hand, label)
                     break
 
-        # ---------- UPDATE / RELEASE ----------
         for obj in world_objects:
-            if not obj.get("grabbed"):
+            if not obj.get("grabbed") or obj["grabbed_by"] != label:
                 continue
-            if obj["grabbed_by"] != label:
-                continue
-
-            if not pinch:
+            if not hand.pinch:
                 release(obj)
                 continue
+            obj["pos"] += (hand.wrist + obj["grab_offset"] - obj["pos"]) * 0.35
+            obj["current_angle"] += (hand.angle + obj["grab_angle"] - obj["current_angle"]) * 0.25
 
-            # Smooth position follow
-            target_pos = hand["wrist"] + obj["grab_offset"]
-            obj["pos"] += (target_pos - obj["pos"]) * 0.35
 
-            # Smooth rotation
-            target_angle = hand["angle"] + obj["grab_angle"]
-            obj["current_angle"] += (target_angle - obj["current_angle"]) * 0.25
+if __name__ == "__main__":
+    import time
+    from collections import namedtuple
+
+    Hand = namedtuple("Hand", "wrist angle pinch")
+    rng = np.random.default_rng(0)
+
+    def world(n):
+        return [
+            {"pos": rng.uniform((0, 0), (1920, 1080)), "current_angle": 0.0,
+             "grabbed": False, "grabbed_by": None, "active": True}
+            for _ in range(n)
+        ]
+
+    hands = {
+        "Left": Hand(np.array([600.0, 500.0]), 0.0, True),
+        "Right": Hand(np.array([1300.0, 500.0]), 0.0, True),
+    }
+    frames = 2000
+
+    objs = world(500)
+    t0 = time.perf_counter()
+    for _ in range(frames):
+        # old main.py: once inside the hand loop, once after the toolbar
+        _scan_update(hands, objs)
+        _scan_update(hands, objs)
+    old = (time.perf_counter() - t0) / frames
+
+    def nearest(point, objs):
+        return min(objs, key=lambda obj: float(((obj["pos"] - point) ** 2).sum()))
+
+    objs = world(500)
+    grabs = GrabSystem()
+    want = {label: nearest(hand.wrist, objs) for label, hand in hands.items()}
+    grabs.update(hands, objs, [("Left", "grab_start"), ("Right", "grab_start")])
+    assert grabs.held["Left"] is want["Left"] and grabs.held["Right"] is want["Right"]
+
+    t0 = time.perf_counter()
+    for _ in range(frames):
+        grabs.update(hands, objs)
+    new = (time.perf_counter() - t0) / frames
+
+    t0 = time.perf_counter()
+    for _ in range(200):
+        grabs.update(hands, objs, [("Left", "grab_end"), ("Right", "grab_end")])
+        grabs.update(hands, objs, [("Left", "grab_start"), ("Right", "grab_start")])
+    start = (time.perf_counter() - t0) / 200
+
+    from systems.spatial_index import SpatialGrid
+    grid = SpatialGrid()
+    grid.rebuild(objs)
+    t0 = time.perf_counter()
+    for _ in range(200):
+        grabs.update(hands, objs, [("Left", "grab_end"), ("Right", "grab_end")], grid)
+        grabs.update(hands, objs, [("Left", "grab_start"), ("Right", "grab_start")], grid)
+    start_grid = (time.perf_counter() - t0) / 200
+
+    print(f"500 objects, 2 hands holding")
+    print(f"  scan-based (2 calls/frame): {old * 1e6:8.1f} us/frame")
+    print(f"  event-driven:               {new * 1e6:8.1f} us/frame")
+    print(f"  grab start + end pair:      {start * 1e6:8.1f} us (scan), {start_grid * 1e6:.1f} us (grid)")
+    # following two held objects skips the two 500-object scans entirely
+    assert new < old, (new, old)
+
+    # contention: both hands are nearest to the same object. The closer hand
+    # (Right) gets it, and Left takes its next-nearest instead
+    objs = [
+        {"pos": np.array([700.0, 500.0]), "current_angle": 0.0, "grabbed": False, "grabbed_by": None},
+        {"pos": np.array([560.0, 500.0]), "current_angle": 0.0, "grabbed": False, "grabbed_by": None},
+    ]
+    both = {"Left": Hand(np.array([650.0, 500.0]), 0.0, True), "Right": Hand(np.array([690.0, 500.0]), 0.0, True)}
+    grabs = GrabSystem()
+    grabs.update(both, objs, [("Right", "grab_start"), ("Left", "grab_start")])
+    print(f"  contention: Right holds x={grabs.held['Right']['pos'][0]:.0f}, "
+          f"Left holds x={grabs.held['Left']['pos'][0]:.0f}")
+    assert grabs.held["Right"] is objs[0] and grabs.held["Left"] is objs[1]
@@ -1,3 +1,6 @@
+from world_store import WorldStore
+
+
 def update(world_objects, dt, ensure_burner_fields):
     """
     Handles non-gravity motion:
@@ -5,7 +8,16 @@ def update(world_objects, dt, ensure_burner_fields):
     - rotation update
     - grabbed-object damping
     - burner field initialization
+
+    Damping factors are per 1/60 s, so the result does not depend on the
+    step size.
     """
+    if isinstance(world_objects, WorldStore):
+        update_store(world_objects, dt, ensure_burner_fields)
+        return
+
+    held_damp = 0.94 ** (dt * 60.0)
+    damp = 0.96 ** (dt * 60.0)
 
     for obj in world_objects:
         if not obj.get("active", True):
@@ -17,10 +29,30 @@ def update(world_objects, dt, ensure_burner_fields):
         # If grabbed, stop linear velocity and damp rotation
         if obj.get("grabbed", False):
             obj["vel"] *= 0.0
-            obj["angular_vel"] *= 0.94
+            obj["angular_vel"] *= held_damp
 
         # Global angular damping
-        obj["angular_vel"] *= 0.96
+        obj["angular_vel"] *= damp
 
         # Apply rotation
         obj["current_angle"] += obj["angular_vel"] * dt * 60.0
+
+
+def update_store(store, dt, ensure_burner_fields):
+    """
+    update() over a WorldStore: the same damping and rotation for every
+    object at once. Burner fields are set up once, when an object is added.
+    Sleeping objects are skipped (see collision_system).
+    """
+    for obj in store.take_added():
+        ensure_burner_fields(obj)
+
+    n = store.size
+    live = store.used[:n] & store.active[:n] & ~store.asleep[:n]
+    held = live & store.grabbed[:n]
+
+    store.vel[:n][held] = 0.0
+    store.ang_vel[:n][held] *= 0.94 ** (dt * 60.0)
+
+    store.ang_vel[:n][live] *= 0.96 ** (dt * 60.0)
+    store.angle[:n][live] += store.ang_vel[:n][live] * dt * 60.0
@@ -1,61 +1,354 @@
 import numpy as np
-import random
 
+from config import PARTICLE_CAPACITY, PARTICLE_BUDGET_SOFT
 
-def update(particles, dt):
+SMOKE = 0
+DROPLET = 1
+
+# per-type velocity damping per 1/60 s, (x, y)
+TYPE_DAMPING = np.array([
+    [0.98, 0.97],   # smoke slowly rises & spreads
+    [1.0, 1.0],     # droplets keep their speed
+], dtype=np.float32)
+
+
+class ParticlePool:
     """
-    Update and decay particles.
+    Fixed-capacity particle storage backed by NumPy arrays.
+
+    Live particles always occupy rows [0, count). Dead ones are removed by
+    swap-remove: rows from the tail move into the holes, so nothing else
+    shifts. Each particle records its spawn order, and when the pool or
+    the global cap is full the oldest particles are evicted first.
     """
-    alive = []
 
-    for p in particles:
-        p["life"] -= dt
-        if p["life"] <= 0:
-            continue
+    def __init__(self, capacity=PARTICLE_CAPACITY, seed=None):
+        self.capacity = capacity
+        self.cap = capacity         # global cap (quality knob), <= capacity
+        self.count = 0
+        self._next_seq = 0
+        self.rng = np.random.default_rng(seed)
+
+        self.pos = np.zeros((capacity, 2), dtype=np.float32)
+        self.vel = np.zeros((capacity, 2), dtype=np.float32)
+        self.life = np.zeros(capacity, dtype=np.float32)
+        self.size = np.zeros(capacity, dtype=np.float32)
+        self.color = np.zeros((capacity, 3), dtype=np.uint8)
+        self.type = np.zeros(capacity, dtype=np.uint8)
+        self.seq = np.zeros(capacity, dtype=np.int64)
+        # each particle's TYPE_DAMPING row raised to the current step size,
+        # stored per row so update() is a plain multiply instead of a gather
+        # over the type column (recomputed only when dt changes)
+        self.damp = np.ones((capacity, 2), dtype=np.float32)
+        self._damp_dt = 1.0 / 60.0
+        self._type_damp = TYPE_DAMPING
+        self.source = np.zeros(capacity, dtype=np.int32)   # emitter id, 0 = none
+
+        self._columns = (self.pos, self.vel, self.life, self.size, self.color, self.type,
+                         self.seq, self.damp, self.source)
+
+    def __len__(self):
+        return self.count
+
+    # --------------------------------------------------------
+
+    def _remove(self, rows):
+        """
+        Swap-remove the given (unique) rows.
+        """
+        n = self.count
+        k = len(rows)
+        if k == 0:
+            return
+        new_n = n - k
+
+        gone = np.zeros(n, dtype=bool)
+        gone[rows] = True
+        holes = np.flatnonzero(gone[:new_n])
+        movers = new_n + np.flatnonzero(~gone[new_n:])
+
+        for col in self._columns:
+            col[holes] = col[movers]
+        self.count = new_n
+
+    def _evict_oldest(self, k):
+        if k <= 0:
+            return
+        seq = self.seq[:self.count]
+        if k >= self.count:
+            self.count = 0
+            return
+        self._remove(np.argpartition(seq, k - 1)[:k])
+
+    def spawn(self, kind, pos, vel, life, size, color, source=0):
+        """
+        Append len(vel) particles in one go. pos/color may be single values.
+        Returns the rows written.
+        """
+        k = min(len(vel), self.capacity)
+        limit = min(self.cap, self.capacity)
+        self._evict_oldest(self.count + k - limit)
+
+        rows = slice(self.count, self.count + k)
+        self.pos[rows] = pos
+        self.vel[rows] = vel[:k]
+        self.life[rows] = life[:k] if np.ndim(life) else life
+        self.size[rows] = size[:k] if np.ndim(size) else size
+        self.color[rows] = color
+        self.type[rows] = kind
+        self.damp[rows] = self._type_damp[kind]
+        self.source[rows] = source
+        self.seq[rows] = np.arange(self._next_seq, self._next_seq + k)
+
+        self._next_seq += k
+        self.count += k
+        return rows
+
+    def update(self, dt, max_particles=None):
+        """
+        Age, move and damp every live particle, then drop the dead and
+        apply the global cap (oldest first).
+        """
+        if max_particles is not None:
+            self.cap = max_particles
 
-        # Move
-        p["pos"] += p["vel"] * dt
+        n = self.count
+        if n == 0:
+            return
 
-        # Smoke slowly rises & spreads
-        if p["type"] == "smoke":
-            p["vel"][0] *= 0.98
-            p["vel"][1] *= 0.97
+        if dt != self._damp_dt:
+            self._damp_dt = dt
+            self._type_damp = TYPE_DAMPING ** np.float32(dt * 60.0)
+            self.damp[:n] = self._type_damp[self.type[:n]]
 
-        alive.append(p)
+        life = self.life[:n]
+        life -= dt
 
-    particles[:] = alive
+        self.pos[:n] += self.vel[:n] * dt
+        self.vel[:n] *= self.damp[:n]
 
+        self._remove(np.flatnonzero(life <= 0))
+        self._evict_oldest(self.count - self.cap)
 
-def spawn_smoke(particles, x, y, count=3):
+    def live(self, kind=None):
+        """
+        Row indices of live particles (optionally of one type).
+        """
+        if kind is None:
+            return np.arange(self.count)
+        return np.flatnonzero(self.type[:self.count] == kind)
+
+
+# ============================================================
+#  SYSTEM FUNCTIONS (CALLED FROM main.py)
+# ============================================================
+
+def update(particles, dt, max_particles=None):
+    """
+    Update and decay particles.
+    If max_particles is set, the oldest particles beyond the cap are dropped.
+    """
+    particles.update(dt, max_particles)
+
+
+def spawn_smoke(particles, x, y, count=3, source=0):
     """
     Spawn smoke particles at position.
     """
-    for _ in range(count):
-        particles.append({
-            "pos": np.array([x, y], float),
-            "vel": np.array([
-                random.uniform(-10, 10),
-                random.uniform(-40, -20),
-            ], float),
-            "life": random.uniform(1.0, 2.0),
-            "type": "smoke",
-            "size": random.randint(10, 18),
-            "color": (200, 200, 200),
-        })
-
-
-def spawn_droplet(particles, x, y, color):
-    """
-    Spawn a liquid droplet.
-    """
-    particles.append({
-        "pos": np.array([x, y], float),
-        "vel": np.array([
-            random.uniform(-10, 10),
-            random.uniform(60, 120),
-        ], float),
-        "life": 1.5,
-        "type": "droplet",
-        "size": 6,
-        "color": color,
-    })
+    rng = particles.rng
+    vel = np.empty((count, 2), dtype=np.float32)
+    vel[:, 0] = rng.uniform(-10, 10, count)
+    vel[:, 1] = rng.uniform(-40, -20, count)
+
+    particles.spawn(
+        SMOKE, (x, y), vel,
+        life=rng.uniform(1.0, 2.0, count),
+        size=rng.integers(10, 19, count),
+        color=(200, 200, 200),
+        source=source,
+    )
+
+
+def spawn_droplet(particles, x, y, color=(255, 120, 0), count=1, source=0):
+    """
+    Spawn liquid droplets.
+    """
+    rng = particles.rng
+    vel = np.empty((count, 2), dtype=np.float32)
+    vel[:, 0] = rng.uniform(-10, 10, count)
+    vel[:, 1] = rng.uniform(60, 120, count)
+
+    particles.spawn(DROPLET, (x, y), vel, life=1.5, size=6, color=color, source=source)
+
+
+# ============================================================
+#  EMITTERS (TIME-BASED SPAWNING)
+# ============================================================
+
+SPAWNERS = {
+    "smoke": spawn_smoke,
+    "droplet": spawn_droplet,
+}
+
+
+class Emitter:
+    """
+    One particle source. Emits `rate` particles per second (integrated
+    against dt, so the load does not depend on frame rate), plus any
+    queued burst.
+
+    cap:  most live particles this emitter may own at once (None = no limit)
+    ttl:  seconds until the emitter removes itself (None = until removed)
+    """
+
+    def __init__(self, eid, kind, pos, rate=0.0, cap=None, burst=0, ttl=None, **spawn_args):
+        self.id = eid
+        self.kind = kind
+        self.pos = pos
+        self.rate = rate
+        self.cap = cap
+        self.pending = burst
+        self.ttl = ttl
+        self.spawn_args = spawn_args
+        self.carry = 0.0        # fractional particles owed from earlier frames
+
+    def burst(self, count):
+        self.pending += count
+
+
+class EmitterSystem:
+    """
+    Registry of emitters feeding one ParticlePool.
+
+    Emitters are registered under any hashable key: main.py keeps one per
+    lit burner and one per dropper held while pouring, and
+    reactions.trigger_reaction adds one per reaction. update(dt) emits for
+    all of them. Once the pool holds more than
+    PARTICLE_BUDGET_SOFT of its cap, every emitter's output is scaled down
+    linearly, reaching zero at the cap. Emission therefore thins out
+    smoothly instead of hitting oldest-first eviction.
+    """
+
+    def __init__(self, pool, soft=PARTICLE_BUDGET_SOFT):
+        self.pool = pool
+        self.soft = soft
+        self.emitters = {}
+        self._free_ids = []
+        self._next_id = 1
+        self.scale = 1.0        # last budget scale, for stats / HUD
+
+    def add(self, key, kind, pos, rate=0.0, cap=None, burst=0, ttl=None, **spawn_args):
+        """
+        Register (or replace) the emitter for `key`.
+        """
+        self.remove(key)
+        if self._free_ids:
+            eid = self._free_ids.pop()
+        else:
+            eid = self._next_id
+            self._next_id += 1
+
+        emitter = Emitter(eid, kind, pos, rate, cap, burst, ttl, **spawn_args)
+        self.emitters[key] = emitter
+        return emitter
+
+    def get(self, key):
+        return self.emitters.get(key)
+
+    def remove(self, key):
+        emitter = self.emitters.pop(key, None)
+        if emitter is not None:
+            # particles already out keep drifting; they just stop counting
+            n = self.pool.count
+            self.pool.source[:n][self.pool.source[:n] == emitter.id] = 0
+            self._free_ids.append(emitter.id)
+
+    def burst(self, key, count):
+        emitter = self.emitters.get(key)
+        if emitter is not None:
+            emitter.burst(count)
+
+    def budget_scale(self):
+        cap = min(self.pool.cap, self.pool.capacity)
+        soft = cap * self.soft
+        live = self.pool.count
+        if live <= soft:
+            return 1.0
+        return max(0.0, (cap - live) / max(1.0, cap - soft))
+
+    def update(self, dt):
+        """
+        Emit this frame's particles for every emitter.
+        """
+        if not self.emitters:
+            return
+
+        self.scale = scale = self.budget_scale()
+
+        n = self.pool.count
+        owned = np.bincount(self.pool.source[:n], minlength=self._next_id)
+
+        for key, e in list(self.emitters.items()):
+            if e.ttl is not None:
+                e.ttl -= dt
+                if e.ttl <= 0 and e.pending == 0:
+                    self.remove(key)
+                    continue
+
+            e.carry += e.rate * dt * scale
+            count = int(e.carry)
+            e.carry -= count
+
+            count += e.pending
+            e.pending = 0
+
+            if e.cap is not None:
+                count = min(count, e.cap - int(owned[e.id]))
+            if count <= 0:
+                continue
+
+            x, y = e.pos
+            SPAWNERS[e.kind](self.pool, x, y, count=count, source=e.id, **e.spawn_args)
+
+
+if __name__ == "__main__":
+    import time
+
+    pool = ParticlePool(seed=0)
+    for _ in range(20000 // 50):
+        spawn_smoke(pool, 960, 540, count=50)
+    pool.life[:pool.count] = 1e6        # keep all 20k alive for the measurement
+    print(f"live particles: {len(pool)}")
+
+    n = 500
+    t0 = time.perf_counter()
+    for _ in range(n):
+        pool.update(1 / 60)
+    print(f"update, 20k live:          {(time.perf_counter() - t0) / n * 1e3:.3f} ms")
+
+    # steady churn: ~2% die and are replaced every frame
+    pool.life[:pool.count] = pool.rng.uniform(0.0, 0.8, pool.count)
+    t0 = time.perf_counter()
+    for _ in range(n):
+        spawn_smoke(pool, 960, 540, count=400)
+        pool.update(1 / 60)
+    print(f"spawn 400 + update, churn: {(time.perf_counter() - t0) / n * 1e3:.3f} ms  ({len(pool)} live)")
+
+    pool.count = 0
+    t0 = time.perf_counter()
+    for _ in range(n):
+        spawn_smoke(pool, 960, 540, count=2)
+    print(f"spawn_smoke(count=2):      {(time.perf_counter() - t0) / n * 1e6:.1f} us")
+
+    # emitters: live load after 5 s is the same at any frame rate
+    for fps in (30, 60, 120):
+        pool = ParticlePool(seed=0)
+        pool.cap = 400
+        emitters = EmitterSystem(pool)
+        for i in range(3):
+            emitters.add(("burner", i), "smoke", (300 + 200 * i, 500), rate=60, cap=150)
+        emitters.add("reaction", "smoke", (900, 500), burst=35, ttl=1.0)
+        for _ in range(5 * fps):
+            emitters.update(1 / fps)
+            pool.update(1 / fps)
+        print(f"emitters @ {fps:3d} fps: {len(pool)} live, budget scale {emitters.scale:.2f}")
@@ -1,6 +1,11 @@
-from physics import apply_gravity
+from physics import apply_gravity, apply_gravity_all
+from world_store import WorldStore
 
 def update(world_objects, dt, floor_y):
+    if isinstance(world_objects, WorldStore):
+        apply_gravity_all(world_objects, dt, floor_y)
+        return
+
     for obj in world_objects:
         if not obj.get("active", True):
             continue
@@ -0,0 +1,79 @@
+from config import (
+    QUALITY_LEVELS,
+    FRAME_BUDGET_MS,
+    QUALITY_DOWN_RATIO,
+    QUALITY_UP_RATIO,
+    QUALITY_DOWN_FRAMES,
+    QUALITY_UP_FRAMES,
+)
+
+
+class QualityGovernor:
+    """
+    Keeps frame time near FRAME_BUDGET_MS by stepping through QUALITY_LEVELS
+    (0 = best). Uses an EMA of frame time with hysteresis:
+
+    - step down after QUALITY_DOWN_FRAMES consecutive frames above
+      budget * QUALITY_DOWN_RATIO
+    - step up after QUALITY_UP_FRAMES consecutive frames below
+      budget * QUALITY_UP_RATIO
+
+    Counters restart after every change, so one change is allowed to
+    settle before the next.
+    """
+
+    def __init__(self, levels=QUALITY_LEVELS, budget_ms=FRAME_BUDGET_MS, level=0):
+        self.levels = levels
+        self.budget_ms = budget_ms
+        self.level = level
+
+        self.ema_ms = budget_ms
+        self._over = 0
+        self._under = 0
+        self.changes = 0
+
+    @property
+    def settings(self):
+        return self.levels[self.level]
+
+    @property
+    def name(self):
+        return self.settings["name"]
+
+    def update(self, frame_time):
+        """
+        Feed one frame time (seconds). Returns True if the level changed.
+        """
+        ms = frame_time * 1000.0
+        self.ema_ms += (ms - self.ema_ms) * 0.1
+
+        if self.ema_ms > self.budget_ms * QUALITY_DOWN_RATIO:
+            self._over += 1
+            self._under = 0
+        elif self.ema_ms < self.budget_ms * QUALITY_UP_RATIO:
+            self._under += 1
+            self._over = 0
+        else:
+            self._over = 0
+            self._under = 0
+
+        if self._over >= QUALITY_DOWN_FRAMES and self.level < len(self.levels) - 1:
+            return self._set(self.level + 1)
+        if self._under >= QUALITY_UP_FRAMES and self.level > 0:
+            return self._set(self.level - 1)
+        return False
+
+    def _set(self, level):
+        old = self.name
+        self.level = level
+        self._over = 0
+        self._under = 0
+        self.changes += 1
+        print(
+            f"[QUALITY] {old} -> {self.name} "
+            f"(frame {self.ema_ms:.1f} ms, budget {self.budget_ms:.1f} ms)"
+        )
+        return True
+
+    def hud_text(self):
+        return f"Q:{self.name} {self.ema_ms:.1f}ms"
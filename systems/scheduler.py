@@ -0,0 +1,87 @@
+from config import SIM_HZ, SIM_MAX_SUBSTEPS
+
+
+class FixedStepScheduler:
+    """
+    Runs the simulation at a fixed rate independent of the frame rate.
+
+    advance(frame_dt) adds the frame's wall-clock time to an accumulator
+    and returns how many fixed steps to run. At most max_substeps run per
+    frame; after a stall the remaining time is dropped instead of being
+    caught up (no spiral of death). `alpha` is how far the leftover time
+    reaches into the next step, for render interpolation.
+    """
+
+    def __init__(self, hz=SIM_HZ, max_substeps=SIM_MAX_SUBSTEPS):
+        self.dt = 1.0 / hz
+        self.max_substeps = max_substeps
+        self.accumulator = 0.0
+
+        self.steps = 0          # total steps run
+        self.dropped = 0.0      # seconds of simulation skipped after stalls
+
+    def advance(self, frame_dt):
+        self.accumulator += max(0.0, frame_dt)
+
+        steps = int(self.accumulator / self.dt)
+        if steps > self.max_substeps:
+            self.dropped += (steps - self.max_substeps) * self.dt
+            steps = self.max_substeps
+
+        self.accumulator -= steps * self.dt
+        if self.accumulator >= self.dt:
+            self.accumulator %= self.dt
+
+        self.steps += steps
+        return steps
+
+    @property
+    def alpha(self):
+        return self.accumulator / self.dt
+
+
+# ============================================================
+#  DEMO: SAME MOTION AT ANY FRAME RATE
+# ============================================================
+
+if __name__ == "__main__":
+    import numpy as np
+
+    from physics import apply_gravity_all
+    from systems.motion_system import update_store
+    from world_store import WorldStore
+
+    def simulate(fps, seconds=3.0, jitter=0.0, fixed=True, seed=0):
+        rng = np.random.default_rng(seed)
+        store = WorldStore()
+        store.append({"pos": (100.0, 100.0), "vel": (80.0, 0.0), "angular_vel": 3.0})
+        scheduler = FixedStepScheduler()
+
+        t = 0.0
+        while t < seconds:
+            frame_dt = (1.0 / fps) * (1.0 + rng.uniform(-jitter, jitter))
+            frame_dt = min(frame_dt, seconds - t)      # end exactly at `seconds`
+            t += frame_dt
+            if fixed:
+                for _ in range(scheduler.advance(frame_dt)):
+                    store.save_previous()
+                    apply_gravity_all(store, scheduler.dt, floor_y=10000.0)
+                    update_store(store, scheduler.dt, lambda obj: None)
+            else:
+                apply_gravity_all(store, frame_dt, floor_y=10000.0)
+                update_store(store, frame_dt, lambda obj: None)
+
+        with store.interpolated(scheduler.alpha if fixed else 1.0):
+            return store.pos[0].copy(), store.angle[0], scheduler
+
+    print("3 s of free fall + spin, final state")
+    for fixed in (False, True):
+        print("  fixed 120 Hz steps + interpolation" if fixed else "  variable dt")
+        for fps in (30, 60, 144):
+            pos, angle, _ = simulate(fps, jitter=0.3, fixed=fixed)
+            print(f"    {fps:3d} fps (+-30% jitter): pos ({pos[0]:7.2f}, {pos[1]:8.2f})  angle {angle:7.3f}")
+
+    # a 1 s stall: at most SIM_MAX_SUBSTEPS steps run, the rest is dropped
+    scheduler = FixedStepScheduler()
+    steps = scheduler.advance(1.0)
+    print(f"1 s stall: {steps} steps, {scheduler.dropped:.3f} s dropped, alpha {scheduler.alpha:.2f}")
@@ -10,6 +10,7 @@ from config import (
 )
 from tools import load_tool_image, TOOLS
 from objects import make_object
+from render.compositing import blend_straight
 
 # Cooldown timer
 last_spawn_time = 0
@@ -29,33 +30,49 @@ TOOL_MAP = {t["id"]: t for t in TOOLS}
 #   Alpha Blending (RGBA over BGR)
 # -----------------------------------------
 def blend_icon(base, icon, x, y):
-    h, w = icon.shape[:2]
+    blend_straight(base, icon, x, y)
 
-    if x + w <= 0 or y + h <= 0 or x >= base.shape[1] or y >= base.shape[0]:
-        return
 
-    y1, y2 = max(0, y), min(base.shape[0], y + h)
-    x1, x2 = max(0, x), min(base.shape[1], x + w)
+# -----------------------------------------
+#   Icon / Ribbon Caches
+# -----------------------------------------
+_icon_cache = {}      # tool_id -> BGRA icon (decoded + resized once)
+_ribbon_cache = {}    # (W, sections, hover) -> (ribbon, icon_positions)
+_hit_tables = {}      # id(icon_positions) -> (icon_positions, column table)
+
+HOVER_COLOR = (80, 200, 255)
+
+
+def get_icon(tool_id):
+    icon = _icon_cache.get(tool_id)
+    if icon is None:
+        img = load_tool_image(tool_id).resize((ICON_SIZE, ICON_SIZE))
+        icon = cv2.cvtColor(np.array(img), cv2.COLOR_RGBA2BGRA)
+        _icon_cache[tool_id] = icon
+    return icon
 
-    iy1 = y1 - y
-    ix1 = x1 - x
-    iy2 = iy1 + (y2 - y1)
-    ix2 = ix1 + (x2 - x1)
 
-    icon_crop = icon[iy1:iy2, ix1:ix2]
-    alpha = icon_crop[:, :, 3] / 255.0
-    alpha = alpha[:, :, None]
+def _sections_key():
+    return tuple((sec["name"], tuple(sec["tools"])) for sec in SECTIONS)
 
-    base_region = base[y1:y2, x1:x2].astype(np.float32)
 
-    blended = (1 - alpha) * base_region + alpha * icon_crop[:, :, :3]
-    base[y1:y2, x1:x2] = blended.astype(np.uint8)
+def _build_hit_table(W, icon_positions):
+    """
+    One entry per screen column: index into icon_positions, or -1.
+    Matches the inclusive x <= ix <= x + ICON_SIZE test of the old scan.
+    """
+    table = np.full(W + 1, -1, dtype=np.int16)
+    for i, (x, _, _) in enumerate(icon_positions):
+        x1, x2 = max(0, x), min(W, x + ICON_SIZE)
+        if x1 <= x2:
+            table[x1:x2 + 1] = i
+    return table
 
 
 # -----------------------------------------
 #   Draw Ribbon (MS Paint Style)
 # -----------------------------------------
-def draw_ribbon(W):
+def _render_ribbon(W):
     ribbon = np.zeros((RIBBON_H, W, 3), dtype=np.uint8)
     ribbon[:] = (35, 35, 35)
 
@@ -90,10 +107,7 @@ def draw_ribbon(W):
         for tool_id in sec["tools"]:
             tool_info = TOOL_MAP[tool_id]
 
-            img = load_tool_image(tool_id).resize((ICON_SIZE, ICON_SIZE))
-            icon_np = np.array(img)
-
-            blend_icon(ribbon, icon_np, x2, y_icon)
+            blend_icon(ribbon, get_icon(tool_id), x2, y_icon)
 
             cv2.rectangle(
                 ribbon,
@@ -112,34 +126,115 @@ def draw_ribbon(W):
     return ribbon, icon_positions
 
 
+def draw_ribbon(W, hover=None):
+    """
+    Return (ribbon image, icon_positions) for a window of width W.
+    Built once per width / section layout; `hover` (index into
+    icon_positions) selects a cached highlighted variant.
+    Callers must treat the returned image as read-only.
+    """
+    sections = _sections_key()
+    key = (W, sections, hover)
+
+    cached = _ribbon_cache.get(key)
+    if cached is not None:
+        return cached
+
+    base = _ribbon_cache.get((W, sections, None))
+    if base is None:
+        # width or sections changed: drop every old variant
+        _ribbon_cache.clear()
+        _hit_tables.clear()
+
+        ribbon, icon_positions = _render_ribbon(W)
+        base = (ribbon, icon_positions)
+        _ribbon_cache[(W, sections, None)] = base
+        _hit_tables[id(icon_positions)] = (icon_positions, _build_hit_table(W, icon_positions))
+
+    if hover is None:
+        return base
+
+    ribbon, icon_positions = base
+    if not 0 <= hover < len(icon_positions):
+        return base
+
+    ribbon = ribbon.copy()
+    x, y, _ = icon_positions[hover]
+    cv2.rectangle(ribbon, (x - 2, y - 2), (x + ICON_SIZE + 2, y + ICON_SIZE + 2), HOVER_COLOR, 2)
+
+    _ribbon_cache[key] = (ribbon, icon_positions)
+    return ribbon, icon_positions
+
+
 # -----------------------------------------
 #   Interaction
 # -----------------------------------------
+def icon_at(ix, iy, icon_positions):
+    """
+    Index of the icon under (ix, iy), or None.
+    O(1) via the column table for ribbons built by draw_ribbon,
+    linear scan for any other icon list.
+    """
+    entry = _hit_tables.get(id(icon_positions))
+    if entry is not None and entry[0] is icon_positions:
+        table = entry[1]
+        if not 0 <= ix < len(table):
+            return None
+        i = int(table[ix])
+        if i < 0:
+            return None
+        y = icon_positions[i][1]
+        return i if y <= iy <= y + ICON_SIZE else None
+
+    for i, (x, y, _) in enumerate(icon_positions):
+        if x <= ix <= x + ICON_SIZE and y <= iy <= y + ICON_SIZE:
+            return i
+    return None
+
+
+def ribbon_hover(detected_hands, icon_positions):
+    """
+    Index of the icon any fingertip is over (for the hover highlight), or None.
+    """
+    for hand in detected_hands.values():
+        i = icon_at(int(hand.index[0]), int(hand.index[1]), icon_positions)
+        if i is not None:
+            return i
+    return None
+
+
 def handle_ribbon_interaction(detected_hands, W, H, icon_positions, world_objects):
+    """
+    Spawn the tool under a fingertip touching the ribbon.
+    Returns the new object, or None.
+    """
     global last_spawn_time
 
     now = time.time()
     if now - last_spawn_time < SPAWN_COOLDOWN:
-        return False
+        return None
 
     for label, hand in detected_hands.items():
-        ix, iy = int(hand["index"][0]), int(hand["index"][1])
+        ix, iy = int(hand.index[0]), int(hand.index[1])
 
         # Must be touching ribbon area
         if iy > RIBBON_H:
             continue
 
-        # Check each icon
-        for (x, y, tool_info) in icon_positions:
-            if x <= ix <= x + ICON_SIZE and y <= iy <= y + ICON_SIZE:
+        # Check icon under fingertip
+        i = icon_at(ix, iy, icon_positions)
+        if i is None:
+            continue
+
+        tool_info = icon_positions[i][2]
 
-                # Spawn tool exactly at center
-                world_objects.append(
-                    make_object(tool_info["id"], W // 2, int(H * 0.40))
-                )
+        # Spawn tool exactly at center
+        obj = world_objects.append(
+            make_object(tool_info["id"], W // 2, int(H * 0.40))
+        )
 
-                last_spawn_time = now
-                print(f"[SPAWN] {tool_info['name']}")
-                return True
+        last_spawn_time = now
+        print(f"[SPAWN] {tool_info['name']}")
+        return obj
 
-    return False
+    return None
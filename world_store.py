@@ -0,0 +1,275 @@
+from collections.abc import MutableMapping
+from contextlib import contextmanager
+
+import numpy as np
+
+
+# ============================================================
+#  STRUCT-OF-ARRAYS WORLD STORE
+# ============================================================
+
+class WorldStore:
+    """
+    World objects kept as contiguous NumPy arrays instead of one dict of
+    tiny arrays per object:
+
+        pos      (N, 2) float64
+        vel      (N, 2) float64
+        angle    (N,)   float64   ("current_angle")
+        ang_vel  (N,)   float64   ("angular_vel")
+        grabbed  (N,)   bool
+        active   (N,)   bool
+        scale    (N,)   float64   sprite scale (collider size)
+        asleep   (N,)   bool      resting body, skipped until touched
+        still    (N,)   float64   seconds spent below the sleep speed
+        idle     (N,)   float64   seconds since last held (LRU despawn)
+        offscreen (N,)  float64   seconds spent off-screen
+        used     (N,)   bool      slot holds a live object
+
+    plus prev_pos / prev_angle, the state before the last simulation step,
+    used to interpolate rendering between fixed steps.
+
+    Every object gets a stable handle (its row) for its whole lifetime;
+    removed rows go on a free list and are reused. Physics and motion run
+    over all rows at once (physics.apply_gravity_all, motion_system).
+
+    During the transition the store also behaves like the old
+    world_objects list: append() takes the dicts made by make_object,
+    and iteration yields WorldObject views that read and write the
+    arrays through the old keys, so render, grab and toolbar code keep
+    working unchanged.
+    """
+
+    def __init__(self, capacity=64):
+        self._alloc(capacity)
+        self._objects = []      # views in insertion order
+        self._free = []
+        self._added = []        # appended since the last take_added()
+
+    def _alloc(self, capacity):
+        self.pos = np.zeros((capacity, 2))
+        self.vel = np.zeros((capacity, 2))
+        self.angle = np.zeros(capacity)
+        self.ang_vel = np.zeros(capacity)
+        self.grabbed = np.zeros(capacity, dtype=bool)
+        self.active = np.zeros(capacity, dtype=bool)
+        self.scale = np.ones(capacity)
+        self.asleep = np.zeros(capacity, dtype=bool)
+        self.still = np.zeros(capacity)
+        self.idle = np.zeros(capacity)
+        self.offscreen = np.zeros(capacity)
+        self.used = np.zeros(capacity, dtype=bool)
+        self.prev_pos = np.zeros((capacity, 2))
+        self.prev_angle = np.zeros(capacity)
+        self.size = 0           # rows ever handed out
+
+    @property
+    def capacity(self):
+        return len(self.used)
+
+    def _grow(self):
+        old = self._columns()
+        size = self.size
+        self._alloc(self.capacity * 2)
+        self.size = size
+        for dst, src in zip(self._columns(), old):
+            dst[:len(src)] = src
+
+    def _columns(self):
+        return (self.pos, self.vel, self.angle, self.ang_vel, self.grabbed, self.active,
+                self.scale, self.asleep, self.still, self.idle, self.offscreen,
+                self.used, self.prev_pos, self.prev_angle)
+
+    # --------------------------------------------------------
+    #  list-like interface
+    # --------------------------------------------------------
+
+    def append(self, obj):
+        """
+        Adopt an object dict (from make_object) and return its view.
+        """
+        if isinstance(obj, WorldObject):
+            if obj.store is self:
+                return obj
+            obj = dict(obj)
+
+        if self._free:
+            h = self._free.pop()
+        else:
+            if self.size == self.capacity:
+                self._grow()
+            h = self.size
+            self.size += 1
+
+        self.pos[h] = obj.pop("pos", (0.0, 0.0))
+        self.vel[h] = obj.pop("vel", (0.0, 0.0))
+        self.angle[h] = obj.pop("current_angle", 0.0)
+        self.ang_vel[h] = obj.pop("angular_vel", 0.0)
+        self.grabbed[h] = obj.pop("grabbed", False)
+        self.active[h] = obj.pop("active", True)
+        self.scale[h] = obj.pop("scale", 1.0)
+        self.asleep[h] = False
+        self.still[h] = 0.0
+        self.idle[h] = 0.0
+        self.offscreen[h] = 0.0
+        self.used[h] = True
+        self.prev_pos[h] = self.pos[h]
+        self.prev_angle[h] = self.angle[h]
+
+        view = WorldObject(self, h, obj)
+        self._objects.append(view)
+        self._added.append(view)
+        return view
+
+    def extend(self, objs):
+        for obj in objs:
+            self.append(obj)
+
+    def remove(self, view):
+        """
+        Drop an object; its handle is recycled.
+        """
+        self._objects.remove(view)
+        if view in self._added:
+            self._added.remove(view)
+        h = view.handle
+        self.used[h] = False
+        self.active[h] = False
+        self.grabbed[h] = False
+        self.asleep[h] = False
+        self.vel[h] = 0.0
+        self.ang_vel[h] = 0.0
+        self._free.append(h)
+
+    def take_added(self):
+        """
+        Objects appended since the last call (for one-time field setup).
+        """
+        added, self._added = self._added, []
+        return added
+
+    def __iter__(self):
+        return iter(self._objects)
+
+    def __len__(self):
+        return len(self._objects)
+
+    def __getitem__(self, i):
+        return self._objects[i]
+
+    # --------------------------------------------------------
+
+    def rows(self):
+        """
+        Handles of every live object (array view of `used`).
+        """
+        return np.flatnonzero(self.used[:self.size])
+
+    def counts(self):
+        """
+        {"objects", "awake", "asleep"} over the live, active objects.
+        """
+        n = self.size
+        live = self.used[:n] & self.active[:n]
+        asleep = int((live & self.asleep[:n]).sum())
+        total = int(live.sum())
+        return {"objects": total, "awake": total - asleep, "asleep": asleep}
+
+    def save_previous(self):
+        """
+        Remember the current state; call before every simulation step.
+        """
+        n = self.size
+        self.prev_pos[:n] = self.pos[:n]
+        self.prev_angle[:n] = self.angle[:n]
+
+    @contextmanager
+    def interpolated(self, alpha):
+        """
+        Temporarily show pos / current_angle blended between the previous
+        and current step (alpha 0..1), e.g. around rendering. Held objects
+        show their exact position, since the hand moves them every frame.
+        """
+        n = self.size
+        pos = self.pos[:n].copy()
+        angle = self.angle[:n].copy()
+
+        blend = ~self.grabbed[:n]
+        self.pos[:n][blend] = self.prev_pos[:n][blend] + (pos[blend] - self.prev_pos[:n][blend]) * alpha
+        self.angle[:n][blend] = self.prev_angle[:n][blend] + (angle[blend] - self.prev_angle[:n][blend]) * alpha
+        try:
+            yield self
+        finally:
+            self.pos[:n] = pos
+            self.angle[:n] = angle
+
+
+# ============================================================
+#  DICT-LIKE OBJECT VIEW
+# ============================================================
+
+class WorldObject(MutableMapping):
+    """
+    One object of a WorldStore, readable and writable like the old dict.
+
+    "pos" / "vel" return row views into the store arrays, so in-place
+    updates (obj["pos"] += d) land in the store. A view stays valid until
+    the store grows, so look it up again each frame instead of keeping it.
+    Keys without an array column live in a small per-object dict.
+    """
+
+    __slots__ = ("store", "handle", "extra")
+
+    _ARRAYS = {"pos": "pos", "vel": "vel"}
+    _SCALARS = {
+        "current_angle": ("angle", float),
+        "angular_vel": ("ang_vel", float),
+        "grabbed": ("grabbed", bool),
+        "active": ("active", bool),
+        "scale": ("scale", float),
+        "asleep": ("asleep", bool),
+    }
+
+    def __init__(self, store, handle, extra):
+        self.store = store
+        self.handle = handle
+        self.extra = extra
+
+    def __getitem__(self, key):
+        col = self._ARRAYS.get(key)
+        if col is not None:
+            return getattr(self.store, col)[self.handle]
+        col = self._SCALARS.get(key)
+        if col is not None:
+            return col[1](getattr(self.store, col[0])[self.handle])
+        return self.extra[key]
+
+    def __setitem__(self, key, value):
+        col = self._ARRAYS.get(key) or self._SCALARS.get(key, (None,))[0]
+        if col is not None:
+            getattr(self.store, col)[self.handle] = value
+        else:
+            self.extra[key] = value
+
+    def __delitem__(self, key):
+        if key in self._ARRAYS or key in self._SCALARS:
+            raise KeyError(f"{key!r} is a store column and cannot be deleted")
+        del self.extra[key]
+
+    def __iter__(self):
+        yield from self._ARRAYS
+        yield from self._SCALARS
+        yield from self.extra
+
+    def __len__(self):
+        return len(self._ARRAYS) + len(self._SCALARS) + len(self.extra)
+
+    def __contains__(self, key):
+        return key in self._ARRAYS or key in self._SCALARS or key in self.extra
+
+    # identity semantics: two views are the same object only if they are
+    __eq__ = object.__eq__
+    __hash__ = object.__hash__
+
+    def __repr__(self):
+        return f"<WorldObject {self.extra.get('tool_id', '?')} #{self.handle}>"